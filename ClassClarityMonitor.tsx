@@ -1,7 +1,9 @@
-import React, { useState, ChangeEvent } from 'react';
+import React, { useState, useEffect, useReducer, ChangeEvent } from 'react';
+import VirtualList from './VirtualList';
 import './ClassClarityMonitor.css';
 
 type TranscriptionLine = {
+  id: number;
   text: string;
   attention: number;
   timestamp: string;
@@ -14,33 +16,134 @@ type Alert = {
   timestamp: string;
 };
 
-const ClassClarityMonitor: React.FC = () => {
-  const [isFeedActive, setIsFeedActive] = useState<boolean>(true);
-  const [selectedImage, setSelectedImage] = useState<string | null>(null);
-  const [attentionRate, setAttentionRate] = useState<number>(50);
-  const [comprehensionRate, setComprehensionRate] = useState<number>(40);
-  const [activeStudents, setActiveStudents] = useState<number>(6);
-
-  // Physics lesson transcription for kids
-  const transcription: TranscriptionLine[] = [
-    { text: "Today we're learning about forces and motion!", attention: 92, timestamp: '00:01:15' },
-    { text: "A force is a push or pull that makes things move.", attention: 90, timestamp: '00:02:30' },
-    { text: "Let's try an experiment with this toy car and ramp!", attention: 95, timestamp: '00:04:10' },
-    { text: "What happens when we make the ramp steeper? The car goes faster!", attention: 89, timestamp: '00:06:45' },
-    { text: "This is because gravity pulls harder on steeper slopes.", attention: 85, timestamp: '00:08:20' },
-    { text: "Now let's see what friction does...", attention: 87, timestamp: '00:10:05' },
-    { text: "When we add rough sandpaper, the car slows down!", attention: 80, timestamp: '00:12:30' },
-    { text: "Friction is a force that works against motion.", attention: 75, timestamp: '00:14:15' },
-    { text: "Can anyone think of examples of friction in everyday life?", attention: 60, timestamp: '00:16:40' },
-    { text: "Great answers! Brakes on bikes use friction to stop.", attention: 50, timestamp: '00:19:10' },
-  ];
-
-  const alerts: Alert[] = [
-    
+type LiveMetrics = {
+  interval: string;
+  attentionRate: number;
+  comprehensionRate: number;
+  activeStudents: number;
+  totalStudents: number;
+};
+
+// Messages pushed by metrics_server.py (see live_metrics.MetricsStream): one reset with the
+// full state, then deltas that append or replace items by their stable id
+type ListDelta<T> = {
+  append: T[];
+  update: T[];
+};
+
+type FeedMessage =
+  | {
+      type: 'reset';
+      seq: number;
+      metrics: LiveMetrics | null;
+      transcription: TranscriptionLine[];
+      alerts: Alert[];
+    }
+  | {
+      type: 'delta';
+      seq: number;
+      metrics?: LiveMetrics;
+      transcription?: ListDelta<TranscriptionLine>;
+      alerts?: ListDelta<Alert>;
+    };
+
+type FeedState = {
+  seq: number;
+  metrics: LiveMetrics;
+  transcription: TranscriptionLine[];
+  alerts: Alert[];
+};
+
+const METRICS_URL = 'ws://localhost:8765/ws';
+const RECONNECT_DELAY_MS = 2000;
+const TRANSCRIPT_ROW_HEIGHT = 58;
+const ALERT_ROW_HEIGHT = 42;
+
+// Physics lesson for kids, shown until the metrics server is reachable
+const DEMO_FEED: FeedState = {
+  seq: -1,
+  metrics: { interval: '', attentionRate: 50, comprehensionRate: 40, activeStudents: 6, totalStudents: 12 },
+  transcription: [
+    { id: 0, text: "Today we're learning about forces and motion!", attention: 92, timestamp: '00:01:15' },
+    { id: 1, text: "A force is a push or pull that makes things move.", attention: 90, timestamp: '00:02:30' },
+    { id: 2, text: "Let's try an experiment with this toy car and ramp!", attention: 95, timestamp: '00:04:10' },
+    { id: 3, text: "What happens when we make the ramp steeper? The car goes faster!", attention: 89, timestamp: '00:06:45' },
+    { id: 4, text: "This is because gravity pulls harder on steeper slopes.", attention: 85, timestamp: '00:08:20' },
+    { id: 5, text: "Now let's see what friction does...", attention: 87, timestamp: '00:10:05' },
+    { id: 6, text: "When we add rough sandpaper, the car slows down!", attention: 80, timestamp: '00:12:30' },
+    { id: 7, text: "Friction is a force that works against motion.", attention: 75, timestamp: '00:14:15' },
+    { id: 8, text: "Can anyone think of examples of friction in everyday life?", attention: 60, timestamp: '00:16:40' },
+    { id: 9, text: "Great answers! Brakes on bikes use friction to stop.", attention: 50, timestamp: '00:19:10' },
+  ],
+  alerts: [
     { id: 2, message: "Comprehension is high during experiments", severity: 'low',timestamp: '00:05:22' },
     { id: 1, message: "2 students are distracted ", severity: 'medium', timestamp: '00:11:35'  },
     { id: 3, message: "6 students are distracted ", severity: 'high', timestamp: '00:19:10'  },
-  ];
+  ],
+};
+
+// Updates almost always touch the newest items, so search for them from the end
+const applyListDelta = <T extends { id: number }>(items: T[], delta?: ListDelta<T>): T[] => {
+  if (!delta) return items;
+  const next = items.slice();
+  delta.update.forEach((item) => {
+    for (let i = next.length - 1; i >= 0; i--) {
+      if (next[i].id === item.id) {
+        next[i] = item;
+        break;
+      }
+    }
+  });
+  return delta.append.length ? next.concat(delta.append) : next;
+};
+
+const feedReducer = (state: FeedState, message: FeedMessage): FeedState => {
+  if (message.type === 'reset') {
+    return {
+      seq: message.seq,
+      metrics: message.metrics ?? state.metrics,
+      transcription: message.transcription,
+      alerts: message.alerts,
+    };
+  }
+  if (message.seq <= state.seq) return state; // Already included in the last reset
+  return {
+    seq: message.seq,
+    metrics: message.metrics ?? state.metrics,
+    transcription: applyListDelta(state.transcription, message.transcription),
+    alerts: applyListDelta(state.alerts, message.alerts),
+  };
+};
+
+const ClassClarityMonitor: React.FC = () => {
+  const [isFeedActive, setIsFeedActive] = useState<boolean>(true);
+  const [selectedImage, setSelectedImage] = useState<string | null>(null);
+  const [feed, dispatch] = useReducer(feedReducer, DEMO_FEED);
+  const { attentionRate, comprehensionRate, activeStudents, totalStudents } = feed.metrics;
+
+  // Follow the live session; reconnect whenever the player (and its server) restarts
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(METRICS_URL);
+      socket.onopen = () => setIsFeedActive(true);
+      socket.onmessage = (event: MessageEvent<string>) => dispatch(JSON.parse(event.data) as FeedMessage);
+      socket.onclose = () => {
+        setIsFeedActive(false);
+        if (!closed) reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      socket?.close();
+    };
+  }, []);
 
   const handleImageUpload = (e: ChangeEvent<HTMLInputElement>): void => {
     const file = e.target.files?.[0];
@@ -93,20 +196,20 @@ const ClassClarityMonitor: React.FC = () => {
           <div className="transcription-container">
             <div className="dashboard-section transcription-section">
               <h1>Lesson Transcript</h1>
-              <div className="transcription-content">
-                <div className="transcription-list">
-                  {transcription.map((line, index) => (
-                    <div 
-                      key={index} 
-                      className={`transcription-line ${getAttentionClass(line.attention)}`}
-                    >
-                      <span className="timestamp">[{line.timestamp}]</span>
-                      <span className="text">{line.text}</span>
-                      <span className="attention-badge">{line.attention}%</span>
-                    </div>
-                  ))}
-                </div>
-              </div>
+              <VirtualList
+                className="transcription-content"
+                items={feed.transcription}
+                rowHeight={TRANSCRIPT_ROW_HEIGHT}
+                getKey={(line) => line.id}
+                followTail={isFeedActive}
+                renderRow={(line) => (
+                  <div className={`transcription-line ${getAttentionClass(line.attention)}`}>
+                    <span className="timestamp">[{line.timestamp}]</span>
+                    <span className="text">{line.text}</span>
+                    <span className="attention-badge">{line.attention}%</span>
+                  </div>
+                )}
+              />
             </div>
           </div>
         </div>
@@ -116,14 +219,19 @@ const ClassClarityMonitor: React.FC = () => {
           {/* Alerts Section */}
           <div className="dashboard-section alerts-section">
             <h1>Alerts</h1>
-            <div className="alerts-list">
-              {alerts.map(alert => (
-                <div key={alert.id} className={`alert-item ${alert.severity}`}>
+            <VirtualList
+              className="alerts-list"
+              items={feed.alerts}
+              rowHeight={ALERT_ROW_HEIGHT}
+              getKey={(alert) => alert.id}
+              followTail={isFeedActive}
+              renderRow={(alert) => (
+                <div className={`alert-item ${alert.severity}`}>
                   <span className="alert-timestamp">[{alert.timestamp}]</span>
                   <span className="alert-message">{alert.message}</span>
                 </div>
-              ))}
-            </div>
+              )}
+            />
           </div>
 
           {/* Classroom Metrics Section */}
@@ -152,7 +260,7 @@ const ClassClarityMonitor: React.FC = () => {
             </div>
             
             <div className="active-students">
-              <strong>Active Students</strong> {activeStudents} / 12
+              <strong>Active Students</strong> {activeStudents} / {totalStudents}
             </div>
           </div>
         </div>
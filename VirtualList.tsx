@@ -0,0 +1,73 @@
+import React, { useState, useEffect, useLayoutEffect, useRef, ReactNode, UIEvent } from 'react';
+
+type VirtualListProps<T> = {
+  items: T[];
+  rowHeight: number; // Every row must render at exactly this height (px)
+  renderRow: (item: T, index: number) => ReactNode;
+  getKey: (item: T) => string | number;
+  className?: string;
+  overscan?: number; // Extra rows rendered above and below the viewport
+  followTail?: boolean; // Keep scrolled to the newest row while the user is at the bottom
+};
+
+// Scrollable list that only mounts the rows in view, so the DOM stays the same size however
+// many items the list holds.
+function VirtualList<T>({
+  items,
+  rowHeight,
+  renderRow,
+  getKey,
+  className,
+  overscan = 5,
+  followTail = false,
+}: VirtualListProps<T>) {
+  const containerRef = useRef<HTMLDivElement>(null);
+  const atBottomRef = useRef<boolean>(true);
+  const [scrollTop, setScrollTop] = useState<number>(0);
+  const [viewportHeight, setViewportHeight] = useState<number>(0);
+
+  useEffect(() => {
+    const container = containerRef.current;
+    if (!container) return;
+    const observer = new ResizeObserver(() => setViewportHeight(container.clientHeight));
+    observer.observe(container);
+    setViewportHeight(container.clientHeight);
+    return () => observer.disconnect();
+  }, []);
+
+  // Stick to the newest row as items arrive, unless the user scrolled up to read
+  useLayoutEffect(() => {
+    const container = containerRef.current;
+    if (followTail && container && atBottomRef.current) {
+      container.scrollTop = container.scrollHeight;
+    }
+  }, [items.length, followTail]);
+
+  const handleScroll = (e: UIEvent<HTMLDivElement>): void => {
+    const container = e.currentTarget;
+    atBottomRef.current = container.scrollTop + container.clientHeight >= container.scrollHeight - rowHeight;
+    setScrollTop(container.scrollTop);
+  };
+
+  const first = Math.max(0, Math.floor(scrollTop / rowHeight) - overscan);
+  const last = Math.min(items.length, Math.ceil((scrollTop + viewportHeight) / rowHeight) + overscan);
+  const visible = items.slice(first, last);
+
+  return (
+    <div ref={containerRef} className={className} onScroll={handleScroll} style={{ overflowY: 'auto' }}>
+      <div className="virtual-list-spacer" style={{ height: items.length * rowHeight }}>
+        {visible.map((item, offset) => (
+          <div
+            key={getKey(item)}
+            className="virtual-list-row"
+            style={{ top: (first + offset) * rowHeight, height: rowHeight }}
+          >
+            {renderRow(item, first + offset)}
+          </div>
+        ))}
+      </div>
+    </div>
+  );
+}
+
+export default VirtualList;
@@ -0,0 +1,55 @@
+from bisect import bisect_right
+
+from attention_metrics import parse_interval_label
+
+INTERVAL_PANE = "interval"  # Per-student alerts (VideoPlayer.display_text_for_selected_interval)
+CUMULATIVE_PANE = "cumulative"  # Whole-class summary (display_text_for_selected_interval_cumulative)
+
+
+class AlertTimeline:
+    """Alert pane updates as timed events, in media-time order.
+
+    The alerts for an interval appear when it ends, so every interval in the display data and the
+    cumulative data becomes one event (time, interval label, panes) at its end. Playback only needs
+    to act at those boundaries: advance() returns the events that came due since the last call and
+    next_time() says when the next one is.
+    """
+
+    def __init__(self, display_data, cumulative_streak_data):
+        panes_by_interval = {}
+        for interval, _ in display_data:
+            panes_by_interval.setdefault(interval, set()).add(INTERVAL_PANE)
+        for interval, *_ in cumulative_streak_data:
+            panes_by_interval.setdefault(interval, set()).add(CUMULATIVE_PANE)
+
+        self.events = sorted((parse_interval_label(interval)[1] * 60, interval, tuple(sorted(panes)))
+                             for interval, panes in panes_by_interval.items())
+        self.times = [event[0] for event in self.events]
+        self.position = 0  # Index of the next event to fire
+
+    def __len__(self):
+        return len(self.events)
+
+    def next_time(self):
+        """Media time of the next event, or None when all have fired."""
+        return self.times[self.position] if self.position < len(self.times) else None
+
+    def advance(self, current_time):
+        """Events due by `current_time` that have not fired yet, in order."""
+        end = bisect_right(self.times, current_time)
+        due = self.events[self.position:end]
+        self.position = max(self.position, end)
+        return due
+
+    def seek(self, current_time):
+        """Jump to `current_time`; returns the latest event per pane at or before it, to redraw the panes."""
+        self.position = bisect_right(self.times, current_time)
+        latest = {}
+        for time, interval, panes in reversed(self.events[:self.position]):
+            for pane in panes:
+                if pane not in latest:
+                    latest[pane] = (time, interval)
+            if len(latest) == 2:
+                break
+        return sorted((time, interval, tuple(sorted(pane for pane in latest if latest[pane][1] == interval)))
+                      for time, interval in set(latest.values()))
@@ -0,0 +1,176 @@
+from scoring_policy import DEFAULT_POLICY
+
+
+def _count(value):
+    """Plain int for whole counts, float when a fractional state weight is involved."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def group_attentiveness_by_interval(attention_data, interval=300, policy=DEFAULT_POLICY):
+    """Group attentiveness data into intervals for each student.
+
+    "attentive_count" is weighted by `policy`; the per-state counts behind it are memoized by
+    the store, so regrouping under another policy does not rescan the samples.
+    """
+    grouped_data = {}
+    registry = attention_data.registry
+    interval_starts, student_ids, state_counts = attention_data.state_count_matrix(interval)
+    attentive_counts = policy.weighted_counts(state_counts)
+    total_counts = state_counts.sum(axis=1)
+    for interval_start, student_id, attentive_count, total_count in zip(interval_starts, student_ids,
+                                                                         attentive_counts, total_counts):
+        # Determine the interval in seconds (e.g., 300-600 seconds)
+        interval_start = int(interval_start)
+        interval_end = interval_start + interval
+        interval_label = f"[{interval_start // 60}-{interval_end // 60}] min"
+
+        # Initialize interval structure
+        if interval_label not in grouped_data:
+            grouped_data[interval_label] = {}
+
+        # By default "Confused" counts as "Attentive" (see scoring_policy.DEFAULT_WEIGHTS)
+        grouped_data[interval_label][registry.name(student_id)] = {
+            "attentive_count": _count(attentive_count),
+            "total_count": int(total_count),
+        }
+
+    return grouped_data
+
+
+def attention_color(percentage_attentive, policy=DEFAULT_POLICY):
+    """Background color of a 10-second subtitle cell for its attentive percentage."""
+    return policy.color(percentage_attentive)
+
+
+def parse_interval_label(interval_label):
+    """Return the (start, end) minutes of a label such as '[3-4] min'."""
+    start, end = interval_label.strip().lstrip("[").split("]")[0].split("-")
+    return int(start), int(end)
+
+
+def calculate_student_intervals(grouped_data, student_streaks=None, policy=DEFAULT_POLICY):
+    """Classify every student in every interval and track how long each state has lasted.
+
+    Returns one row per (interval, student) with the counts, percentage, state, tag, streak
+    and display phrase. `student_streaks` is updated in place so callers can keep it around.
+    """
+    if student_streaks is None:
+        student_streaks = {}
+
+    rows = []
+    for interval, students in grouped_data.items():
+        for student, stats in students.items():
+            total_count = stats["total_count"]
+            attentive_count = stats["attentive_count"]
+            attentiveness_percentage = (attentive_count / total_count * 100) if total_count > 0 else 0
+
+            # Initialize streak tracking if needed
+            if student not in student_streaks:
+                student_streaks[student] = {"streak": 0, "last_state": "Attentive"}
+
+            # Determine the tag and state based on attentiveness percentage
+            current_state, tag = policy.classify(attentiveness_percentage)
+
+            # Update streak based on state
+            if current_state == student_streaks[student]["last_state"]:
+                student_streaks[student]["streak"] += 1  # Increment streak by one interval
+            else:
+                student_streaks[student]["streak"] = 1  # Reset streak on state change
+
+            student_streaks[student]["last_state"] = current_state
+
+            # Adjust phrase to include streak information
+            streak_minutes = student_streaks[student]["streak"]
+            phrase = f" {student}"
+            if current_state == "Inattentive":
+                phrase += f"  totally inattentive for {streak_minutes} minutes."
+            elif current_state == "Attentive":
+                phrase += f"  has been attentive for {streak_minutes} minutes."
+            elif current_state == "Inconsistent":  # Handle yellow state streak
+                phrase += f"  partially inattentive for {streak_minutes} minutes."
+
+            rows.append({
+                "interval": interval,
+                "student": student,
+                "attentive_count": attentive_count,
+                "total_count": total_count,
+                "attentiveness_percentage": attentiveness_percentage,
+                "state": current_state,
+                "tag": tag,
+                "streak": streak_minutes,
+                "phrase": phrase,
+            })
+
+    return rows
+
+
+def build_display_data(student_rows):
+    """Collect student rows into the [(interval, [(phrase, tag), ...]), ...] list the alert pane renders."""
+    display_data = []
+    for row in student_rows:
+        if not display_data or display_data[-1][0] != row["interval"]:
+            display_data.append((row["interval"], []))
+        display_data[-1][1].append((row["phrase"], row["tag"]))
+    return display_data
+
+
+def calculate_cumulative_data(grouped_data, policy=DEFAULT_POLICY):
+    """Calculate cumulative class performance for all intervals.
+
+    Returns a list of (interval_label, attentiveness_percentage, state, streak) tuples.
+    """
+    cumulative_streak_data = []
+
+    # Variables to store cumulative counts
+    cumulative_attentive_count = 0
+    cumulative_total_count = 0
+
+    for interval_label, students in grouped_data.items():
+        interval_attentive_count = 0
+        interval_total_count = 0
+
+        # Sum counts for the current interval
+        for stats in students.values():
+            interval_total_count += stats["total_count"]
+            interval_attentive_count += stats["attentive_count"]
+
+        cumulative_total_count += interval_total_count
+        cumulative_attentive_count += interval_attentive_count
+
+        if cumulative_total_count == 0:
+            attentiveness_percentage = 0
+            current_state = "No data"
+            streak = 0
+        else:
+            attentiveness_percentage = (cumulative_attentive_count / cumulative_total_count) * 100
+
+            # Determine the current state
+            current_state, _ = policy.classify(attentiveness_percentage)
+
+            # Determine streak
+            if not cumulative_streak_data:
+                streak = 1  # First interval
+            else:
+                _, _, last_state, last_streak = cumulative_streak_data[-1]
+                streak = last_streak + 1 if current_state == last_state else 1
+
+        cumulative_streak_data.append(
+            (interval_label, attentiveness_percentage, current_state, streak)
+        )
+
+    return cumulative_streak_data
+
+
+def cumulative_phrase(attentiveness_percentage, state, streak):
+    """Return the (phrase, tag) shown in the class-wide alert pane for one cumulative row."""
+    if state == "No data":
+        return "No data available for this interval.", "red"
+    elif state == "Inattentive":
+        return (f"The class is mostly inattentive ({attentiveness_percentage:.2f}% only attentive) "
+                f"for {streak} minutes."), "red"
+    elif state == "Inconsistent":
+        return (f"The class is partially inattentive ({attentiveness_percentage:.2f}% only attentive) "
+                f"for {streak} minutes."), "yellow"
+    else:
+        return f"The class is highly attentive ({attentiveness_percentage:.2f}% attentive) for {streak} minutes.", "green"
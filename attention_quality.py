@@ -0,0 +1,145 @@
+import argparse
+
+import numpy as np
+
+from attention_store import AttentionState, AttentionStore, StudentRegistry
+
+MAX_HOLD_SECONDS = 5  # Gaps up to this long are filled with the student's last state, longer ones stay empty
+UNKNOWN_POLICIES = ("drop", "reassign", "keep")
+
+
+def _dedup(seconds, student_ids, states):
+    """One sample per (student, second), by majority vote (ties go to the lower AttentionState).
+
+    Returns the (seconds, student_ids, states) of the kept samples, ordered by student then second.
+    """
+    n_states = len(AttentionState)
+    span = int(seconds.max()) + 1
+    keys = student_ids.astype(np.int64) * span + seconds
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    votes = np.bincount(inverse.reshape(-1) * n_states + states,
+                        minlength=len(unique_keys) * n_states).reshape(len(unique_keys), n_states)
+    return unique_keys % span, (unique_keys // span).astype(np.uint16), votes.argmax(axis=1).astype(np.uint8)
+
+
+def _missing_student(seconds, student_ids, span):
+    """For every second, the one tracked student without a sample then, or -1.
+
+    A student is tracked from their first to their last sample. Per second, the ids of tracked
+    students and of students seen are summed; when exactly one is missing, the difference is its id.
+    """
+    known = student_ids != StudentRegistry.UNKNOWN_ID
+    seconds, student_ids = seconds[known], student_ids[known].astype(np.int64)
+    n_ids = int(student_ids.max()) + 1 if len(student_ids) else 1
+    first = np.full(n_ids, span, dtype=np.int64)
+    last = np.full(n_ids, -1, dtype=np.int64)
+    np.minimum.at(first, student_ids, seconds)
+    np.maximum.at(last, student_ids, seconds)
+    ids = np.flatnonzero(last >= 0)
+
+    # Tracked counts and id sums per second, from +/- steps at span edges
+    steps = np.zeros((2, span + 1), dtype=np.int64)
+    np.add.at(steps, (0, first[ids]), 1)
+    np.add.at(steps, (0, last[ids] + 1), -1)
+    np.add.at(steps, (1, first[ids]), ids)
+    np.add.at(steps, (1, last[ids] + 1), -ids)
+    tracked_count, tracked_sum = np.cumsum(steps, axis=1)[:, :span]
+
+    seen_count = np.bincount(seconds, minlength=span)
+    seen_sum = np.bincount(seconds, weights=student_ids, minlength=span).astype(np.int64)
+    return np.where(tracked_count - seen_count == 1, tracked_sum - seen_sum, -1)
+
+
+def _resample(seconds, student_ids, states, max_hold):
+    """Fill gaps of up to `max_hold` seconds with the previous state, giving a 1 Hz grid per student.
+
+    Input is ordered by student then second. Returns (seconds, student_ids, states, filled) where
+    `filled` flags the seconds that were not observed; the number of seconds left empty is also
+    returned.
+    """
+    following = np.empty_like(seconds)
+    following[:-1] = seconds[1:]
+    same_student = np.zeros(len(seconds), dtype=bool)
+    same_student[:-1] = student_ids[1:] == student_ids[:-1]
+    gaps = np.where(same_student, following - seconds - 1, 0)
+    held = np.where(gaps <= max_hold, gaps, 0)
+
+    repeats = held + 1
+    run_starts = np.repeat(np.cumsum(repeats) - repeats, repeats)
+    offsets = np.arange(int(repeats.sum())) - run_starts
+    return (np.repeat(seconds, repeats) + offsets,
+            np.repeat(student_ids, repeats),
+            np.repeat(states, repeats),
+            offsets > 0,
+            int(gaps[gaps > max_hold].sum()))
+
+
+def normalize_attention(attention_data, unknowns="drop", max_hold=MAX_HOLD_SECONDS):
+    """Clean up raw samples so every student contributes one sample per second they were tracked.
+
+    - Duplicates: several samples of one student in the same second become one, by majority vote.
+    - Unknowns: samples of the 'unknown' participant are dropped, kept as-is, or ("reassign")
+      given to the student who is missing in that second when exactly one tracked student is.
+    - Gaps: each student is resampled to a 1 Hz grid between their first and last sample; gaps of
+      up to `max_hold` seconds repeat the last state and are flagged in the store's `filled`
+      column, longer gaps are left out.
+
+    Percentages are then no longer biased toward students the detector saw more often. Returns
+    (store, report) where report counts what each step changed.
+    """
+    if unknowns not in UNKNOWN_POLICIES:
+        raise ValueError(f"Unknown policy for unknown participants {unknowns!r} "
+                         f"(expected one of {', '.join(UNKNOWN_POLICIES)})")
+    report = {"raw_samples": len(attention_data), "duplicates_merged": 0, "unknown_samples": 0,
+              "unknown_reassigned": 0, "unknown_dropped": 0, "filled_samples": 0, "gap_seconds": 0}
+    registry = attention_data.registry
+    if len(attention_data) == 0:
+        return attention_data, report
+
+    start = int(attention_data.timestamps.min())
+    seconds, student_ids, states = _dedup(attention_data.timestamps.astype(np.int64) - start,
+                                          attention_data.student_ids, attention_data.states)
+    report["duplicates_merged"] = len(attention_data) - len(seconds)
+
+    unknown = student_ids == StudentRegistry.UNKNOWN_ID
+    report["unknown_samples"] = int(np.count_nonzero(unknown))
+    if unknowns == "reassign" and unknown.any():
+        missing = _missing_student(seconds, student_ids, int(seconds.max()) + 1)[seconds[unknown]]
+        student_ids[np.flatnonzero(unknown)[missing >= 0]] = missing[missing >= 0]
+        report["unknown_reassigned"] = int(np.count_nonzero(missing >= 0))
+        unknown = student_ids == StudentRegistry.UNKNOWN_ID
+        order = np.lexsort((seconds, student_ids))  # Reassigned samples join their student's run
+        seconds, student_ids, states = seconds[order], student_ids[order], states[order]
+        unknown = unknown[order]
+    if unknowns != "keep":
+        report["unknown_dropped"] = int(np.count_nonzero(unknown))
+        seconds, student_ids, states = seconds[~unknown], student_ids[~unknown], states[~unknown]
+    if len(seconds) == 0:
+        return AttentionStore([], [], [], registry, filled=[]), report
+
+    seconds, student_ids, states, filled, report["gap_seconds"] = _resample(seconds, student_ids, states, max_hold)
+    report["filled_samples"] = int(np.count_nonzero(filled))
+    return AttentionStore(seconds + start, student_ids, states, registry, filled=filled), report
+
+
+def samples_per_student(attention_data):
+    """{name: sample count} for the students in the store."""
+    counts = np.bincount(attention_data.student_ids, minlength=len(attention_data.registry))
+    return {name: int(count) for name, count in zip(attention_data.registry.names, counts) if count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report what normalizing an attention CSV would change.")
+    parser.add_argument("csv_path", help="attention CSV (Timestamp, Name, State)")
+    parser.add_argument("--unknowns", choices=UNKNOWN_POLICIES, default="drop")
+    parser.add_argument("--max-hold", type=int, default=MAX_HOLD_SECONDS, help="longest gap filled, in seconds")
+    args = parser.parse_args()
+
+    raw = AttentionStore.from_csv(args.csv_path)
+    normalized, report = normalize_attention(raw, args.unknowns, args.max_hold)
+    for name, value in report.items():
+        print(f"{name:>18}: {value}")
+    before, after = samples_per_student(raw), samples_per_student(normalized)
+    print(f"{'student':>18}  {'raw':>6}  {'normalized':>10}")
+    for name in before:
+        print(f"{name:>18}  {before[name]:>6}  {after.get(name, 0):>10}")
@@ -0,0 +1,234 @@
+import csv
+from array import array
+from enum import IntEnum
+
+import numpy as np
+
+
+class AttentionState(IntEnum):
+    """Attention states written by the detection model, stored as one byte per sample."""
+    ATTENTIVE = 0
+    CONFUSED = 1
+    NOT_ATTENTIVE = 2
+    UNKNOWN = 3
+
+    @classmethod
+    def from_label(cls, label):
+        """Map a CSV label such as 'Not Attentive' to its state (unrecognised labels become UNKNOWN)."""
+        return _STATE_BY_LABEL.get(label.strip().lower(), cls.UNKNOWN)
+
+    @property
+    def label(self):
+        return _LABEL_BY_STATE[self]
+
+
+_LABEL_BY_STATE = {
+    AttentionState.ATTENTIVE: "Attentive",
+    AttentionState.CONFUSED: "Confused",
+    AttentionState.NOT_ATTENTIVE: "Not Attentive",
+    AttentionState.UNKNOWN: "Unknown",
+}
+_STATE_BY_LABEL = {label.lower(): state for state, label in _LABEL_BY_STATE.items()}
+
+# Bit i is set when state i counts as attentive ("Confused" is treated as "Attentive")
+ATTENTIVE_MASK = (1 << AttentionState.ATTENTIVE) | (1 << AttentionState.CONFUSED)
+
+
+def is_attentive(states):
+    """Vectorised bitmask test: True where a state counts as attentive."""
+    return ((ATTENTIVE_MASK >> np.asarray(states, dtype=np.uint8)) & 1).astype(bool)
+
+
+class StudentRegistry:
+    """Interns student names to small integer ids; id 0 is reserved for the 'unknown' participant."""
+    UNKNOWN_NAME = "unknown"
+    UNKNOWN_ID = 0
+
+    def __init__(self, names=()):
+        self._names = [self.UNKNOWN_NAME]
+        self._ids = {self.UNKNOWN_NAME: self.UNKNOWN_ID}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        """Return the id for `name`, registering it on first sight."""
+        name = name.strip()
+        student_id = self._ids.get(name)
+        if student_id is None:
+            student_id = len(self._names)
+            self._names.append(name)
+            self._ids[name] = student_id
+        return student_id
+
+    def id_of(self, name):
+        """Return the id for `name`, or None if it was never registered."""
+        return self._ids.get(name.strip())
+
+    def name(self, student_id):
+        return self._names[student_id]
+
+    @property
+    def names(self):
+        return list(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name.strip() in self._ids
+
+
+class AttentionStore:
+    """Column store of attention samples: timestamp (int32), student id (uint16) and state (uint8).
+
+    Samples are kept sorted by timestamp so time-range lookups are binary searches. Columns that
+    are already sorted (e.g. memory-mapped from a session archive) are used without copying.
+    Normalized stores (see attention_quality) also flag the samples that filled a gap in `filled`.
+    """
+
+    def __init__(self, timestamps, student_ids, states, registry, presorted=False, filled=None):
+        self.timestamps = np.asarray(timestamps, dtype=np.int32)
+        self.student_ids = np.asarray(student_ids, dtype=np.uint16)
+        self.states = np.asarray(states, dtype=np.uint8)
+        self.filled = np.asarray(filled, dtype=bool) if filled is not None else None
+        if not presorted:
+            order = np.argsort(self.timestamps, kind="stable")
+            self.timestamps = self.timestamps[order]
+            self.student_ids = self.student_ids[order]
+            self.states = self.states[order]
+            if self.filled is not None:
+                self.filled = self.filled[order]
+        self.registry = registry
+        self.attentive = is_attentive(self.states)
+        self._count_cache = {}  # interval -> state_count_matrix result
+        self._buffers = None  # Column buffers with spare capacity, once samples are appended
+
+    @classmethod
+    def from_csv(cls, csv_path, registry=None):
+        """Load attentiveness data from the model's CSV output (Timestamp, Name, State)."""
+        registry = registry if registry is not None else StudentRegistry()
+        timestamps = array("i")
+        student_ids = array("H")
+        states = array("B")
+        with open(csv_path, 'r', encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            # Clean up column names by stripping extra spaces
+            reader.fieldnames = [field.strip() for field in reader.fieldnames]
+
+            for row in reader:
+                # Make sure the column exists
+                if row.get('Timestamp') is None:
+                    print("Timestamp not found in row:", row)
+                    continue  # Skip this row if 'Timestamp' is missing
+
+                timestamps.append(int(float(row['Timestamp'])))  # Convert '1.0' to 1
+                student_ids.append(registry.intern(row['Name']))
+                states.append(AttentionState.from_label(row['State']))
+
+        return cls(np.frombuffer(timestamps, dtype=np.int32),
+                   np.frombuffer(student_ids, dtype=np.uint16),
+                   np.frombuffer(states, dtype=np.uint8),
+                   registry)
+
+    @classmethod
+    def merge(cls, stores, offsets=None):
+        """One store holding the samples of several streams, with students matched by name.
+
+        `offsets` (seconds, one per store) shift each stream onto the shared media clock. The
+        same student seen by two streams in one second keeps both samples; normalize the merged
+        store (see attention_quality) to count them once.
+        """
+        registry = StudentRegistry()
+        offsets = offsets or [0] * len(stores)
+        timestamps, student_ids, states = [], [], []
+        for store, offset in zip(stores, offsets):
+            id_map = np.array([registry.intern(name) for name in store.registry.names], dtype=np.uint16)
+            timestamps.append(store.timestamps.astype(np.int64) + int(round(offset)))
+            student_ids.append(id_map[store.student_ids])
+            states.append(store.states)
+        return cls(np.concatenate(timestamps), np.concatenate(student_ids), np.concatenate(states), registry)
+
+    def append(self, timestamps, student_ids, states):
+        """Add samples to the store, e.g. as a live class produces them.
+
+        Columns grow into buffers with spare capacity, so appending samples in time order costs
+        O(new samples); out-of-order samples trigger a re-sort. Memoized counts are dropped.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int32)
+        if len(timestamps) == 0:
+            return
+        columns = (("timestamps", timestamps), ("student_ids", np.asarray(student_ids, dtype=np.uint16)),
+                   ("states", np.asarray(states, dtype=np.uint8)), ("attentive", is_attentive(states)))
+        if self.filled is not None:
+            columns += (("filled", np.zeros(len(timestamps), dtype=bool)),)
+        size = len(self.timestamps)
+        new_size = size + len(timestamps)
+        buffers = self._buffers
+        if buffers is None or new_size > len(buffers["timestamps"]):
+            capacity = max(1024, 2 * new_size)
+            buffers = {}
+            for name, values in columns:
+                buffers[name] = np.empty(capacity, dtype=values.dtype)
+                buffers[name][:size] = getattr(self, name)
+            self._buffers = buffers
+        in_order = size == 0 or timestamps[0] >= self.timestamps[-1]
+        for name, values in columns:
+            buffers[name][size:new_size] = values
+            setattr(self, name, buffers[name][:new_size])
+        if not in_order or np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(self.timestamps, kind="stable")
+            for name, _ in columns:
+                buffers[name][:new_size] = getattr(self, name)[order]
+        self._count_cache.clear()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self):
+        filled = self.filled.nbytes if self.filled is not None else 0
+        return self.timestamps.nbytes + self.student_ids.nbytes + self.states.nbytes + filled
+
+    def time_slice(self, start_time, end_time):
+        """Return the slice of samples with start_time <= timestamp <= end_time."""
+        lo = np.searchsorted(self.timestamps, start_time, side="left")
+        hi = np.searchsorted(self.timestamps, end_time, side="right")
+        return slice(lo, hi)
+
+    def attentive_percentage(self, start_time, end_time):
+        """Percentage of attentive samples within [start_time, end_time] (0 when empty)."""
+        window = self.attentive[self.time_slice(start_time, end_time)]
+        if len(window) == 0:
+            return 0
+        return np.count_nonzero(window) / len(window) * 100
+
+    def state_counts(self, start_time, end_time):
+        """Number of samples per AttentionState within [start_time, end_time]."""
+        window = self.states[self.time_slice(start_time, end_time)]
+        return np.bincount(window, minlength=len(AttentionState))
+
+    def state_count_matrix(self, interval):
+        """Count samples per AttentionState for every (interval, student).
+
+        Returns (interval_starts, student_ids, counts) where counts has one row per key and one
+        column per AttentionState, keys ordered by interval, then by each student's first
+        appearance inside the interval. The result is memoized per interval, so re-scoring the
+        same session (see scoring_policy) costs a matrix product instead of another pass over
+        the samples.
+        """
+        cached = self._count_cache.get(interval)
+        if cached is not None:
+            return cached
+        n_ids = len(self.registry)
+        n_states = len(AttentionState)
+        bins = self.timestamps.astype(np.int64) // interval
+        keys = bins * n_ids + self.student_ids
+        unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        cells = inverse.astype(np.int64).reshape(-1) * n_states + self.states
+        counts = np.bincount(cells, minlength=len(unique_keys) * n_states).reshape(len(unique_keys), n_states)
+
+        order = np.argsort(first_index, kind="stable")
+        unique_keys = unique_keys[order]
+        cached = (unique_keys // n_ids * interval, (unique_keys % n_ids).astype(np.uint16), counts[order])
+        self._count_cache[interval] = cached
+        return cached
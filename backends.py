@@ -0,0 +1,64 @@
+import importlib
+import threading
+
+# Heavy media backends, imported on first use so the analysis modules (and the player window)
+# start without paying for them. Module name -> hint shown when it is missing.
+BACKENDS = {
+    "cv2": "Video playback needs OpenCV (pip install opencv-python)",
+    "pygame": "Audio playback needs pygame (pip install pygame)",
+    "av": "Reading or writing media containers needs PyAV (pip install av)",
+    "pyarrow": "Session archives need pyarrow (pip install pyarrow)",
+}
+PLAYBACK = ("cv2", "pygame", "av")  # What the player preloads; archives are read before any window opens
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def load(name):
+    """Import backend `name` once and return the module."""
+    module = _modules.get(name)
+    if module is None:
+        with _lock:  # preload() may be importing it on another thread
+            module = _modules.get(name)
+            if module is None:
+                try:
+                    module = importlib.import_module(name)
+                except ImportError as e:
+                    raise ImportError(BACKENDS.get(name, f"Could not import {name}")) from e
+                _modules[name] = module
+    return module
+
+
+def cv2():
+    return load("cv2")
+
+
+def pygame():
+    return load("pygame")
+
+
+def av():
+    return load("av")
+
+
+def pyarrow():
+    """pyarrow, with the IPC and Parquet modules session archives use."""
+    module = load("pyarrow")
+    importlib.import_module("pyarrow.ipc")
+    importlib.import_module("pyarrow.parquet")
+    return module
+
+
+def preload(names=PLAYBACK):
+    """Import backends on a background thread, so the first Play does not wait for them."""
+    def run():
+        for name in names:
+            try:
+                load(name)
+            except ImportError as e:
+                print(f"Warning: {e}")
+
+    thread = threading.Thread(target=run, name="backend-preload", daemon=True)
+    thread.start()
+    return thread
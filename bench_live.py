@@ -0,0 +1,136 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from attention_store import AttentionStore
+from live_metrics import LiveSession
+from process_stats import rss_bytes, format_bytes
+from transcript import load_word_subtitles
+
+PERCENTILES = (50, 90, 99)
+
+
+class ReplayedClass:
+    """One simulated class: the recorded samples are fed to a LiveSession as its clock reaches them."""
+
+    def __init__(self, source, word_subtitles):
+        self.source = source
+        self.session = LiveSession(source.registry, word_subtitles)
+        self.cursor = 0
+        self.busy = False  # An update is still running; later ticks are skipped, like MetricsHub coalescing
+        self.bytes_sent = 0
+
+    def update(self, media_time):
+        """Ingest the samples recorded by `media_time`, advance the pipeline and serialise the delta."""
+        source = self.source
+        end = int(np.searchsorted(source.timestamps, media_time, side="right"))
+        self.session.ingest(source.timestamps[self.cursor:end], source.student_ids[self.cursor:end],
+                            source.states[self.cursor:end])
+        self.cursor = end
+        message = self.session.advance(media_time)
+        if message is not None:
+            self.bytes_sent += len(json.dumps(message, separators=(",", ":")))
+
+
+def run_load(source, word_subtitles, classes, speed, tick, duration, workers=None):
+    """Replay `classes` copies of a session at `speed`x for `duration` media seconds.
+
+    Every class is due for an update each `tick` wall seconds (phases are spread across the tick).
+    Latency is measured from when an update was due to when it finished, so it includes time spent
+    waiting for a worker; a tick that arrives while the class's previous update is still running
+    is counted as missed. Returns a dict of results.
+    """
+    replays = [ReplayedClass(source, word_subtitles) for _ in range(classes)]
+    latencies = []
+    missed = 0
+    lock = threading.Lock()
+
+    def update(replay, media_time, due):
+        try:
+            replay.update(media_time)
+        finally:
+            finished = time.perf_counter()
+            with lock:
+                latencies.append(finished - due)
+            replay.busy = False
+
+    ticks = int(duration / speed / tick) + 1
+    rss_start = rss_peak = rss_bytes()
+    cpu_start = time.process_time()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers or classes, thread_name_prefix="live-class") as pool:
+        for tick_index in range(ticks):
+            for number, replay in enumerate(replays):
+                due = started + (tick_index + number / classes) * tick
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if replay.busy:
+                    missed += 1
+                    continue
+                replay.busy = True
+                pool.submit(update, replay, min((due - started) * speed, duration), due)
+            rss = rss_bytes()
+            if rss is not None and rss_peak is not None:
+                rss_peak = max(rss_peak, rss)
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "classes": classes,
+        "updates": len(latencies),
+        "missed": missed,
+        "latency_ms": {f"p{p}": float(np.percentile(latencies_ms, p)) for p in PERCENTILES} if len(latencies) else {},
+        "max_ms": float(latencies_ms.max()) if len(latencies) else 0.0,
+        "cpu_percent": cpu / wall * 100,
+        "rss_start": rss_start,
+        "rss_peak": rss_peak,
+        "bytes_per_update": sum(replay.bytes_sent for replay in replays) / max(1, len(latencies)),
+        "alerts": sum(len(replay.session.session_metrics.alerts) for replay in replays),
+    }
+
+
+def print_results(results, tick):
+    header = (f"{'classes':>7} {'updates':>8} {'missed':>7} " + " ".join(f"{'p%d ms' % p:>8}" for p in PERCENTILES)
+              + f" {'max ms':>8} {'CPU %':>6} {'RSS peak':>10} {'bytes/upd':>9}")
+    print(header)
+    for result in results:
+        latencies = " ".join(f"{result['latency_ms'].get(f'p{p}', 0):8.2f}" for p in PERCENTILES)
+        late = " *" if result["missed"] or result["latency_ms"].get("p99", 0) > tick * 1000 else ""
+        print(f"{result['classes']:>7} {result['updates']:>8} {result['missed']:>7} {latencies} "
+              f"{result['max_ms']:8.2f} {result['cpu_percent']:6.1f} {format_bytes(result['rss_peak']):>10} "
+              f"{result['bytes_per_update']:9.0f}{late}")
+    print(f"* missed ticks, or p99 latency above the {tick * 1000:.0f} ms update period")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded sessions as simultaneous live classes and measure "
+                                                 "the aggregation and alert pipeline under load.")
+    parser.add_argument("--csv", default="Jan9_cropped_video_First_Grade_Zoom_try2.csv", help="attention CSV")
+    parser.add_argument("--transcription", default="First_Grade_Zoom_transcription.csv", help="word transcription CSV")
+    parser.add_argument("--classes", type=int, nargs="+", default=[1, 4, 16],
+                        help="numbers of simultaneous classes to try, e.g. 1 4 16 64")
+    parser.add_argument("--speed", type=float, default=10.0, help="replay speed multiplier")
+    parser.add_argument("--tick", type=float, default=0.1, help="seconds between updates of each class")
+    parser.add_argument("--duration", type=float, help="media seconds to replay (default: the whole session)")
+    parser.add_argument("--workers", type=int, help="update threads (default: one per class, like one hub each)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    source = AttentionStore.from_csv(args.csv)
+    word_subtitles = load_word_subtitles(args.transcription)
+    duration = args.duration or float(source.timestamps[-1]) + 60  # Let the last interval close
+    print(f"Replaying {duration:.0f} s of {args.csv} at {args.speed:g}x, one update per class every "
+          f"{args.tick * 1000:.0f} ms (RSS before: {format_bytes(rss_bytes())})")
+
+    results = [run_load(source, word_subtitles, classes, args.speed, args.tick, duration, args.workers)
+               for classes in args.classes]
+    print_results(results, args.tick)
+    if args.json:
+        with open(args.json, 'w', encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
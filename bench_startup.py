@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules the analysis core must not pull in (they belong to the player and are loaded lazily)
+HEAVY_MODULES = ("cv2", "pygame", "PIL", "PyQt5", "pyarrow", "av")
+CORE_MODULES = ("attention_store", "attention_metrics", "transcript", "phrase_attention", "live_metrics",
+                "session_catalog", "session_archive")
+
+# Run in a fresh interpreter: import the analysis core, then report timings and what got loaded
+CORE_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{"import_ms": (time.perf_counter() - started) * 1000,
+                  "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+# Run in a fresh interpreter: time imports, window construction and the first paint of the player
+WINDOW_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+import final
+imported = time.perf_counter()
+
+app = QApplication(sys.argv)
+player = final.VideoPlayer({video!r}, {audio!r}, csv_path={csv!r}, transcription_file={transcription!r},
+                           archive_path={archive!r})
+constructed = time.perf_counter()
+
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            painted = time.perf_counter()
+            print(json.dumps({{"import_ms": (imported - started) * 1000,
+                              "construct_ms": (constructed - imported) * 1000,
+                              "visible_ms": (painted - started) * 1000,
+                              "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+            app.quit()
+        return False
+
+
+first_paint = FirstPaint()
+player.installEventFilter(first_paint)
+player.show()
+QTimer.singleShot(10000, app.quit)  # Give up if the window never paints
+app.exec_()
+"""
+
+
+def run_probe(code, runs):
+    """Run `code` in `runs` fresh interpreters; returns the parsed JSON line of each run."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - started) * 1000
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if output.returncode != 0 or not lines:
+            print(f"Error: probe failed:\n{output.stderr.strip()}")
+            return results
+        result = json.loads(lines[-1])
+        result["wall_ms"] = wall_ms
+        results.append(result)
+    return results
+
+
+def report(title, results, keys):
+    print(title)
+    for key in keys:
+        values = [result[key] for result in results]
+        print(f"  {key:<13} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+    heavy = results[-1]["heavy"] if results else []
+    print(f"  heavy modules loaded: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure startup time of the analysis core and the player window.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--video", default="session.mp4", help="video path (not opened until Play)")
+    parser.add_argument("--audio", default=None, help="separate audio file, if any")
+    parser.add_argument("--csv", default="Jan9_cropped_video_First_Grade_Zoom_try2.csv", help="attention CSV")
+    parser.add_argument("--transcription", default="First_Grade_Zoom_transcription.csv", help="word transcription CSV")
+    parser.add_argument("--archive", default=None, help="session archive to load instead of the CSVs")
+    parser.add_argument("--no-window", action="store_true", help="only measure the analysis core")
+    args = parser.parse_args()
+
+    core = run_probe(CORE_PROBE.format(modules=CORE_MODULES, heavy=HEAVY_MODULES), args.runs)
+    if core:
+        report("Analysis core import", core, ("import_ms", "wall_ms"))
+
+    if not args.no_window:
+        window = run_probe(WINDOW_PROBE.format(video=args.video, audio=args.audio, csv=args.csv,
+                                               transcription=args.transcription, archive=args.archive,
+                                               heavy=HEAVY_MODULES), args.runs)
+        if window:
+            report("Player window", window, ("import_ms", "construct_ms", "visible_ms", "wall_ms"))
@@ -1,40 +1,128 @@
-import csv
+import argparse
 import os
 import sys
-import cv2
-import pygame
-from PIL.Image import Image
+from concurrent.futures import wait
+from bisect import bisect_left
 from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QGridLayout, QWidget, QPushButton, QTextEdit, \
-    QListWidget, QGraphicsDropShadowEffect
-from PyQt5.QtGui import QImage, QPixmap, QColor, QTextCharFormat, QTextCursor, QTextImageFormat, QFont, QPalette, \
+    QListWidget, QListWidgetItem, QLineEdit, QVBoxLayout, QHBoxLayout, QGraphicsDropShadowEffect, QAbstractItemView, \
+    QComboBox
+from PyQt5.QtGui import QColor, QTextCharFormat, QTextCursor, QTextImageFormat, QFont, QPalette, \
     QLinearGradient, QBrush
 from PyQt5.QtCore import QTimer, Qt, QElapsedTimer
 
+from attention_metrics import group_attentiveness_by_interval, calculate_student_intervals, build_display_data, \
+    calculate_cumulative_data, cumulative_phrase, attention_color
+from alert_timeline import AlertTimeline, INTERVAL_PANE, CUMULATIVE_PANE
+from attention_quality import normalize_attention, UNKNOWN_POLICIES
+from attention_store import AttentionStore
+import backends
+from media_audio import MusicFileClock, ContainerAudioClock
+from player_resources import SharedResources, shared_resources
+from process_stats import rss_bytes, format_bytes
+from qt_profiler import QtProfiler
+from scoring_policy import DEFAULT_POLICY, PRESET_POLICIES, load_policy
+from session_archive import load_session_archive
+from session_manifest import resolve_sessions, validate_session, player_arguments
+from timeline_widget import TimelineWidget
+from transcript import load_word_subtitles, load_transcript_index, format_timestamp, WordColumns
+from video_streams import StreamDecoder
+from video_surface import FramePool, VideoSurface
+
+SUBTITLE_WINDOW_CELLS = 90  # Long sessions keep this many 10-second cells (15 minutes) in the list...
+SUBTITLE_PAGE_CELLS = 30  # ...and fetch older ones this many at a time when scrolled to the top
+
 
 class VideoPlayer(QMainWindow):
 
-    def __init__(self, video_path, audio_path, csv_path, transcription_file):
+    def __init__(self, video_path, audio_path=None, csv_path=None, transcription_file=None, archive_path=None,
+                 metrics_port=None, resources=None, long_session=False, policy=None, normalize=None, streams=None,
+                 profiler=None):
         super().__init__()
+        if profiler is not None:
+            # Wrap the timed slots before any signal is connected to them (see qt_profiler.PLAYER_SLOTS)
+            profiler.instrument(self, prefix=os.path.splitext(os.path.basename(video_path))[0])
+        # Extra camera streams (see session_manifest) follow the same media clock on their own decoders
+        self.stream_sessions = streams or []
+        self.streams = [StreamDecoder(stream["video_path"], stream.get("offset", 0.0), stream.get("name"))
+                        for stream in self.stream_sessions]
+        # Unknown-participant handling when samples are normalized at load (see load_attention_data)
+        self.normalize = normalize
+        # How samples are weighted and classified; can be switched at runtime (see set_scoring_policy)
+        self.policy = policy or DEFAULT_POLICY
+        # Long sessions keep words as columns and only a window of subtitle cells (see display_words)
+        self.long_session = long_session
+        self.subtitle_first_cell = 0  # Cell index of the subtitle list's first row
+        self.resources = resources or shared_resources()  # Decoder pool and icons shared between windows
         self.attentiveness_all_class = None
         self.cumulative_streak_data = []
         self.displayed_images = []
         self.cumulative_interval_processed = set()
         self.display_data = []
+        self.student_rows = []
         self.word_subtitles = []
         self.video_path = video_path
         self.audio_path = audio_path
+        # Without a separate audio file, the audio track is decoded from the video container
+        self.audio = MusicFileClock(audio_path) if audio_path else ContainerAudioClock(video_path)
         self.interval_processed = set()
         self.csv_path = csv_path
         self.cap = None  # Video capture object
+        self.frame_pool = FramePool(target_width=1100)  # Reused frame buffers (see update_frame)
+        self.next_frame = 0  # Index after the last frame requested from the decoder
+        self.capture_position = 0  # Index of the frame cap.read() will return next (decoder side)
+        self.decode_job = None  # Pending decode_frame() on the shared decoder pool
         self.timer = None  # Timer for updating video frames
         self.fps = 30  # Default frame rate (will be updated from the video)
+        self.transcript_index = None
+        self.metrics_hub = None  # Optional dashboard server (see start_metrics_server)
 
         # Initialize the UI
         self.init_ui()
-        self.attention_data = self.load_attention_data()
-        self.load_word_subtitles(transcription_file)
-        self.display_inattentive_students()
-        self.calculate_cumulative_data()
+        if archive_path is not None:
+            # Exported sessions already carry the computed metrics; the columns are memory-mapped
+            self.load_session_archive(archive_path)
+            archived_data = self.attention_data
+            self.attention_data = self.merge_stream_attention(archived_data)
+            # The archive's metrics cover its own samples only and use the default policy
+            if self.attention_data is not archived_data or self.policy != DEFAULT_POLICY:
+                self.display_inattentive_students()
+                self.calculate_cumulative_data()
+        else:
+            self.attention_data = self.load_attention_data()
+            self.load_word_subtitles(transcription_file)
+            self.transcript_index = load_transcript_index(transcription_file, self.word_subtitles)
+            self.display_inattentive_students()
+            self.calculate_cumulative_data()
+
+        # Thumbnails and heatmap come from the session's cache, or are built in the background
+        self.timeline.set_policy(self.policy)
+        self.timeline.load(video_path, self.attention_data)
+
+        # Alert panes only change at interval boundaries; a single-shot timer wakes them up there
+        self.alert_timeline = AlertTimeline(self.display_data, self.cumulative_streak_data)
+        self.alert_timer = QTimer(self)
+        self.alert_timer.setSingleShot(True)
+        self.alert_timer.timeout.connect(self.fire_alerts)
+
+        if metrics_port is not None:
+            self.start_metrics_server(metrics_port)
+
+    def start_metrics_server(self, port):
+        """Serve live metrics for this session to ClassClarityMonitor dashboards."""
+        from metrics_server import MetricsHub  # Only needed when a dashboard port is given
+        hub = MetricsHub(self.session_metrics(), port=port)
+        try:
+            hub.start()
+        except OSError as e:
+            print(f"Error: Could not start the metrics server on port {port}: {e}")
+            return
+        self.metrics_hub = hub
+
+    def session_metrics(self):
+        """Dashboard metrics for the session, scored under the current policy."""
+        from live_metrics import SessionMetrics
+        return SessionMetrics(self.attention_data, self.word_subtitles, self.student_rows,
+                              self.cumulative_streak_data, self.policy)
 
     def set_dark_theme(app):
         """Set a dark theme for the application."""
@@ -95,27 +183,27 @@ class VideoPlayer(QMainWindow):
         # Set a gradient background for the main window
         self.set_gradient_background()
 
-        # Video display area (row 0, column 0)
-        self.video_frame = QLabel(self)
-        self.video_frame.setAlignment(Qt.AlignCenter)
-        self.video_frame.setStyleSheet(
-            """
-            QLabel {
-                background-color: black;
-                border-radius: 15px;
-                border: 2px solid #555;
-            }
-            """
-        )
-
-        # Add shadow effect to video_frame
-        video_shadow = QGraphicsDropShadowEffect()
-        video_shadow.setBlurRadius(20)  # Soften the shadow
-        video_shadow.setColor(QColor(0, 0, 0, 150))  # Black with 60% opacity
-        video_shadow.setOffset(5, 5)  # Shadow offset (x, y)
-        self.video_frame.setGraphicsEffect(video_shadow)
-
-        self.layout.addWidget(self.video_frame, 0, 0, 2, 1)  # Row 0, Column 0
+        # Video display area (row 0, column 0); paints its rounded frame and shadow itself
+        self.video_frame = VideoSurface(self)
+
+        if self.streams:
+            # Extra streams play in a row under the main video
+            video_area = QWidget(self)
+            video_layout = QVBoxLayout(video_area)
+            video_layout.setContentsMargins(0, 0, 0, 0)
+            video_layout.addWidget(self.video_frame, 3)
+            stream_row = QHBoxLayout()
+            self.stream_surfaces = []
+            for stream in self.streams:
+                surface = VideoSurface(self)
+                surface.setToolTip(stream.name)
+                stream_row.addWidget(surface)
+                self.stream_surfaces.append(surface)
+            video_layout.addLayout(stream_row, 1)
+            self.layout.addWidget(video_area, 0, 0, 2, 1)  # Row 0, Column 0
+        else:
+            self.stream_surfaces = []
+            self.layout.addWidget(self.video_frame, 0, 0, 2, 1)  # Row 0, Column 0
 
         # Textbox under the video (row 1, column 0)
         self.subtitle_listbox = QListWidget(self)
@@ -141,9 +229,35 @@ class VideoPlayer(QMainWindow):
         listbox_shadow.setColor(QColor(0, 0, 0, 100))
         listbox_shadow.setOffset(5, 5)
         self.subtitle_listbox.setGraphicsEffect(listbox_shadow)
+        self.subtitle_listbox.verticalScrollBar().valueChanged.connect(self.fetch_earlier_subtitles)
 
         self.layout.addWidget(self.subtitle_listbox, 3, 0, 2, 1)  # Row 4, Column 0
 
+        # Transcript search (row 2, column 0): hits are colored by their 10-second block
+        self.search_box = QLineEdit(self)
+        self.search_box.setPlaceholderText("Search transcript...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.search_transcript)
+
+        self.search_results = QListWidget(self)
+        self.search_results.setMaximumHeight(110)
+        self.search_results.setStyleSheet("QListWidget { font-size: 13px; border-radius: 8px; }")
+        self.search_results.itemClicked.connect(self.seek_to_search_result)
+        self.search_results.hide()
+
+        # Scrub bar: thumbnail strip over the per-student attention heatmap
+        self.timeline = TimelineWidget(self)
+        self.timeline.seek_requested.connect(self.seek)
+
+        search_panel = QWidget(self)
+        search_layout = QVBoxLayout(search_panel)
+        search_layout.setContentsMargins(0, 0, 0, 0)
+        search_layout.addWidget(self.timeline)
+        search_layout.addLayout(self.init_policy_selector())
+        search_layout.addWidget(self.search_box)
+        search_layout.addWidget(self.search_results)
+        self.layout.addWidget(search_panel, 2, 0)
+
         # Textbox 1 (row 0, column 1) - Takes 25% of the column height
         self.attentiveness_all_class = QTextEdit(self)
         self.attentiveness_all_class.setPlaceholderText("General Alerts")
@@ -278,9 +392,54 @@ class VideoPlayer(QMainWindow):
         palette = self.palette()
         palette.setBrush(QPalette.Window, QBrush(gradient))
         self.setPalette(palette)
-    def play_video(self):
-        """Start playing the video and audio."""
-        # Open the video file
+
+    def init_policy_selector(self):
+        """Row with a combo box to re-score the session under another scoring policy."""
+        self.policy_selector = QComboBox(self)
+        policies = list(PRESET_POLICIES)
+        if self.policy not in policies:
+            policies.append(self.policy)
+        for policy in policies:
+            self.policy_selector.addItem(policy.name, policy)
+        self.policy_selector.setCurrentIndex(policies.index(self.policy))
+        self.policy_selector.currentIndexChanged.connect(
+            lambda index: self.set_scoring_policy(self.policy_selector.itemData(index)))
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Scoring:", self))
+        row.addWidget(self.policy_selector, 1)
+        return row
+
+    def set_scoring_policy(self, policy):
+        """Re-score the session under `policy` and refresh everything that shows a score.
+
+        The store keeps the per-interval state counts, so this only reweights and reclassifies.
+        """
+        if policy == self.policy:
+            return
+        self.policy = policy
+        self.student_streaks = {}
+        self.display_inattentive_students()
+        self.calculate_cumulative_data()
+        self.alert_timeline = AlertTimeline(self.display_data, self.cumulative_streak_data)
+        if self.metrics_hub is not None:
+            self.metrics_hub.set_metrics(self.session_metrics())  # Dashboards get a reset under the new policy
+        playing = self.timer is not None and self.timer.isActive()
+        current_time = self.audio.position() if playing else None  # The clock may not be started yet
+        self.sync_alerts(current_time or 0.0, schedule=playing and current_time is not None)
+
+        # Recolor the subtitle cells and search results already on screen
+        for row in range(self.subtitle_listbox.count()):
+            item = self.subtitle_listbox.item(row)
+            item.setBackground(QColor(self.subtitle_cell(self.subtitle_first_cell + row)[1]))
+        self.search_transcript(self.search_box.text())
+        self.timeline.set_policy(policy)
+
+    def play_video(self, start_time=0.0):
+        """Start playing the video and audio, optionally from `start_time` seconds."""
+        # Open the video file (OpenCV is imported on first use, see backends.preload)
+        cv2 = backends.cv2()
+        self.release_capture()  # Play pressed again: let any pending decode finish first
         self.cap = cv2.VideoCapture(self.video_path)
         if not self.cap.isOpened():
             print("Error: Could not open video.")
@@ -294,189 +453,265 @@ class VideoPlayer(QMainWindow):
         width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         print(f"Video loaded: {width}x{height} at {self.fps} FPS")
+        self.frame_pool.configure(width, height)
+        self.next_frame = self.capture_position = 0
 
-        # Initialize Pygame for audio playback
-        pygame.mixer.init()
-        pygame.mixer.music.load(self.audio_path)
-        pygame.mixer.music.play()
+        # Start the audio; its position is the media clock the video follows
+        self.audio.start(start_time)
+        for stream in self.streams:
+            stream.start(start_time)
+        self.sync_alerts(start_time)
 
         self.elapsed_timer = QElapsedTimer()
         self.elapsed_timer.start()  # Start the timer
 
         # Start the timer to update video frames
         self.timer = QTimer(self)
+        self.timer.setObjectName("frame-timer")
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(int(1000 / self.fps))
 
 
     def update_frame(self):
-        """Update the video frame displayed in the QLabel."""
-        if not pygame.mixer.music.get_busy():  # Stop if audio is not playing
-            self.timer.stop()
-            self.cap.release()
+        """Update the video frame displayed in the video surface."""
+        if not self.audio.is_playing():  # Stop if audio is not playing
+            self.end_playback()
             return
 
         # Get the current audio playback time in seconds
-        audio_time_ms = pygame.mixer.music.get_pos()  # Audio time in milliseconds
-        if audio_time_ms == -1:  # Audio is not playing
+        current_time = self.audio.position()
+        if current_time is None:  # Audio has not started yet
             return
-        current_time = audio_time_ms / 1000.0  # Convert to seconds
+        if self.metrics_hub is not None:
+            self.metrics_hub.publish_position(current_time)  # Snapshot is built on the hub's thread
 
         # Seek the video to the frame corresponding to the current audio time
         target_frame = int(current_time * self.fps)
         if target_frame >= self.total_frames:  # End of video
-            self.timer.stop()
-            self.cap.release()
-            pygame.mixer.music.stop()
-            return
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-
-        # Read the frame
-        ret, frame = self.cap.read()
-        if not ret:
-            self.timer.stop()
-            self.cap.release()
-            pygame.mixer.music.stop()
+            self.end_playback()
             return
 
-        # Display words based on the current time
+        # Show the frame decoded since the last tick
+        if self.decode_job is not None and self.decode_job.done():
+            image = self.decode_job.result()
+            self.decode_job = None
+            if image is None:  # No more frames
+                self.end_playback()
+                return
+            self.video_frame.set_image(image)
+
+        # Extra streams hand over whatever their decoders have ready; late frames were already dropped
+        for stream, surface in zip(self.streams, self.stream_surfaces):
+            stream_image = stream.frame_at(current_time)
+            if stream_image is not None:
+                surface.set_image(stream_image)
+
+        # Request the frame due now, unless it is already on screen or still being decoded
+        if self.decode_job is None and target_frame != self.next_frame - 1:
+            self.decode_job = self.resources.decoder_pool.submit(self.decode_frame, self.cap, target_frame)
+            self.next_frame = target_frame + 1
+
+        # Display words based on the current time (the alert panes update from fire_alerts)
         self.display_words(current_time)
+        self.timeline.set_position(current_time)
 
-        # Display interval text
-        interval_start = ((current_time // 60) * 60)-60
-        interval_end = interval_start + 60
-        interval_label = f"[{interval_start // 60:.0f}-{interval_end // 60:.0f}] min"
-
-        self.display_text_for_selected_interval(interval_label)
-        self.display_text_for_selected_interval_cumulative(interval_label)
+    def decode_frame(self, cap, frame_index):
+        """Decode frame `frame_index` and convert it for display; runs on the shared decoder pool.
 
-        # Resize and convert the frame to RGB
-        original_height, original_width = frame.shape[:2]
-        target_width = 1100  # Set your desired width here
-        aspect_ratio = original_width / original_height
-        target_height = int(target_width / aspect_ratio)
-        frame = cv2.resize(frame, (target_width, target_height))  # Resize to fit the window
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Convert the frame to QImage
-        height, width, channel = frame.shape
-        bytes_per_line = 3 * width
-        q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
+        Returns the QImage to show, or None at the end of the video. Only one job per window is in
+        flight, so the frame pool's buffers are never written by two threads at once.
+        """
+        if frame_index != self.capture_position:  # Only seek when the audio clock jumped
+            cap.set(backends.cv2().CAP_PROP_POS_FRAMES, frame_index)
+        frame = self.frame_pool.read(cap)
+        if frame is None:
+            return None
+        self.capture_position = frame_index + 1
+        # Resize and convert the frame to RGB in preallocated buffers; the surface paints the QImage directly
+        return self.frame_pool.convert(frame)
+
+    def end_playback(self):
+        """Stop everything playback drives once the media has ended; the last frames stay on screen."""
+        self.timer.stop()
+        self.alert_timer.stop()  # fire_alerts would otherwise keep polling a clock that never restarts
+        self.release_capture()
+        self.audio.stop()
+        self.stop_streams()
+
+    def stop_streams(self):
+        """Stop the extra stream decoders, releasing their threads and captures."""
+        for stream in self.streams:
+            if stream.cap is not None:
+                print(f"Stream {stream.name}: {stream.shown} frames shown, {stream.dropped} dropped as late")
+            stream.stop()
+
+    def release_capture(self):
+        """Release the video once its pending decode job, if any, has finished."""
+        if self.decode_job is not None:
+            wait([self.decode_job])
+            self.decode_job = None
+        if self.cap:
+            self.cap.release()
 
-        # Convert QImage to QPixmap and display it in the QLabel
-        pixmap = QPixmap.fromImage(q_image)
-        self.video_frame.setPixmap(pixmap)
+    def closeEvent(self, event):
+        """Stop this session's playback and dashboard server; other session windows keep running."""
+        self.stop_video()
+        self.timeline.stop()
+        if self.metrics_hub is not None:
+            self.metrics_hub.stop()
+        super().closeEvent(event)
 
     def stop_video(self):
         """Stop the video and audio playback."""
-        if self.cap:
-            self.cap.release()
-        if pygame.mixer.get_init():
-            pygame.mixer.music.stop()
+        self.release_capture()
+        self.audio.stop()
         if self.timer and self.timer.isActive():
             self.timer.stop()
+        self.alert_timer.stop()
         self.video_frame.clear()  # Clear the video display
+        self.stop_streams()
+        for surface in self.stream_surfaces:
+            surface.clear()
+
+    def seek(self, seconds):
+        """Jump playback to `seconds`, starting it if needed."""
+        if self.timer is None or not self.timer.isActive():
+            self.play_video(start_time=seconds)
+            return
+        self.audio.seek(seconds)
+        self.sync_alerts(seconds)
+
+    def sync_alerts(self, current_time, schedule=True):
+        """Redraw the alert panes for `current_time` and schedule the next alert boundary."""
+        # Let the alert panes redraw for the interval we landed in
+        self.interval_processed.clear()
+        self.cumulative_interval_processed.clear()
+        for event in self.alert_timeline.seek(current_time):
+            self.show_alert_event(event)
+        if schedule:
+            self.schedule_alerts(current_time)
+
+    def schedule_alerts(self, current_time):
+        """Arm the single-shot alert timer for the next boundary after `current_time`."""
+        next_time = self.alert_timeline.next_time()
+        if next_time is not None:
+            self.alert_timer.start(max(0, int((next_time - current_time) * 1000)) + 1)
+
+    def fire_alerts(self):
+        """Show the alerts that came due; the timer is wall-clock, so re-check against the media clock."""
+        current_time = self.audio.position()
+        if current_time is None:  # Audio is still starting; try again shortly
+            self.alert_timer.start(50)
+            return
+        for event in self.alert_timeline.advance(current_time):
+            self.show_alert_event(event)
+        self.schedule_alerts(current_time)
+
+    def show_alert_event(self, event):
+        _, interval_label, panes = event
+        if INTERVAL_PANE in panes:
+            self.display_text_for_selected_interval(interval_label)
+        if CUMULATIVE_PANE in panes:
+            self.display_text_for_selected_interval_cumulative(interval_label)
+
+    def search_transcript(self, query):
+        """List the places where `query` is spoken, colored by the class attention at that time."""
+        self.search_results.clear()
+        hits = self.transcript_index.search(query) if self.transcript_index and query.strip() else []
+        self.search_results.setVisible(bool(hits))
+
+        word_starts = self.transcript_index.starts if hits else []
+        for start in hits[:200]:
+            position = bisect_left(word_starts, start)
+            # Index positions follow start time, like word_columns (the CSV itself may be unsorted)
+            context = " ".join(word["word"] for word in self.word_columns[max(0, position - 3):position + 8])
+            block_start = (start // 10) * 10
+            percentage_attentive = self.aggregate_attention_seconds_percentage(block_start, block_start + 10)
+
+            item = QListWidgetItem(f"[{format_timestamp(start)}] {context}")
+            item.setBackground(QColor(attention_color(percentage_attentive, self.policy)))
+            item.setData(Qt.UserRole, start)
+            self.search_results.addItem(item)
+
+    def seek_to_search_result(self, item):
+        self.seek(item.data(Qt.UserRole))
 
     def aggregate_attention_seconds_percentage(self, start_time, end_time):
         """
-           Calculate the percentage of 'Attentive' or 'Confused' records
+           Calculate the weighted percentage of attentive records (see the scoring policy)
            within the specified time interval [start_time, end_time].
            """
-        attentive_count = 0
-        total_count = 0
-
-        for entry in self.attention_data:
-            timestamp = entry["timestamp"]
-            state = entry["state"]
-
-            # Check if the timestamp is within the interval
-            if start_time <= timestamp <= end_time:
-                total_count += 1  # Count all records in the interval
-                if state in {"Attentive", "Confused"}:
-                    attentive_count += 1  # Count only attentive or confused states
-
-        # Calculate percentage
-        if total_count > 0:
-            percentage_attentive = (attentive_count / total_count) * 100
-        else:
-            percentage_attentive = 0  # Avoid division by zero
-
-        return percentage_attentive
+        return self.policy.percentage(self.attention_data.state_counts(start_time, end_time))
 
     def load_word_subtitles(self, word_file):
         """Load word-by-word subtitles and map to phrase-level colors."""
-        with open(word_file, 'r', encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                start_time = float(row['Start Time'])
-                end_time = float(row['End Time'])
-                word = row['Word'].strip()
-
-                # Find the phrase this word belongs to
-                phrase_color = "#ffffff"  # Default color (white)
-                '''for subtitle in self.subtitles:
-                    if subtitle['start'] <= start_time < subtitle['end']:
-                        phrase_color = subtitle['color']
-                        break
-                '''
-                # Append the word with its phrase's color
-                self.word_subtitles.append({
-                    "start": start_time,
-                    "end": end_time,
-                    "word": word,
-                    # "color": phrase_color,
-                    'processed': False
-                })
-
-    def display_words(self, current_time):
-        """Display words in the QListWidget based on the current time."""
-        # Determine the interval based on the 10-second blocks
-        interval_start = (current_time // 10) * 10
+        words = load_word_subtitles(word_file)
+        self.word_columns = WordColumns.from_word_subtitles(words)
+        if self.long_session:
+            self.word_subtitles = self.word_columns  # Dicts are built per lookup instead of kept
+        else:
+            self.word_subtitles.extend(words)
+
+    def load_session_archive(self, archive_path):
+        """Load samples, words and precomputed interval/cumulative metrics from a session archive."""
+        archive = load_session_archive(archive_path)
+        self.attention_data = archive.attention_data
+        self.word_columns = archive.word_columns
+        # Long sessions read words straight from the memory-mapped columns
+        self.word_subtitles = archive.word_columns if self.long_session else archive.word_subtitles
+        self.student_rows = archive.student_rows
+        self.display_data = archive.display_data
+        self.transcript_index = archive.transcript_index
+        self.cumulative_streak_data = archive.cumulative_streak_data
+
+    def subtitle_cell(self, cell_index, current_time=None):
+        """Text and color of the 10-second subtitle cell `cell_index`, with the words spoken by `current_time`."""
+        interval_start = cell_index * 10
         interval_end = interval_start + 10
-        cell_index = int(interval_start) // 10
 
-        # Calculate the percentage of attentiveness (replace with your logic)
+        # Calculate the percentage of attentiveness and the matching color
         percentage_attentive = self.aggregate_attention_seconds_percentage(interval_start, interval_end)
+        color = attention_color(percentage_attentive, self.policy)
 
-        # Determine color based on attentiveness percentage
-        if percentage_attentive >= 70:
-            color = '#4CAF50'  # High attentiveness
-        elif percentage_attentive >= 50:
-            color = '#FFB300'  # Moderate attentiveness
-        else:
-            color = '#F44336'  # Low attentiveness
-
-        # Build the text for the current interval
-        current_interval_text = ""
-        for word in self.word_subtitles:
-            word_start = word['start']
-            word_end = word['end']
+        # Only the words of this cell, found by binary search; show a word once its start time has passed
+        words = self.word_columns.window(interval_start, interval_end)
+        text = " ".join(word['word'] for word in words if current_time is None or word['start'] <= current_time)
+        return text, color
 
-            # Only consider the words within the current 10-second interval
-            if interval_start <= word_start < interval_end:
-                if word_start <= current_time:  # Display the word if its start time has passed
-                    current_interval_text += word['word'] + " "
+    def display_words(self, current_time):
+        """Display words in the QListWidget based on the current time."""
+        # Determine the interval based on the 10-second blocks
+        cell_index = int(current_time // 10)
+        current_interval_text, color = self.subtitle_cell(cell_index, current_time)
 
         # Update the QListWidget
         if hasattr(self, 'subtitle_listbox'):
             if cell_index >= 0:  # If the cell index is valid
-                if cell_index < self.subtitle_listbox.count():  # If the cell already exists
-                    item = self.subtitle_listbox.item(cell_index)
+                if self.long_session:
+                    self.window_subtitles(cell_index)
+                row = cell_index - self.subtitle_first_cell
+                if row < self.subtitle_listbox.count():  # If the cell already exists
+                    item = self.subtitle_listbox.item(row)
                     if item is not None:
-                        item.setText(current_interval_text.strip())
+                        item.setText(current_interval_text)
                         item.setBackground(QColor(color))
                     else:
                         print(f"Warning: Item at index {cell_index} is None.")
                 else:  # If the cell does not exist, add a new item
-                    self.subtitle_listbox.addItem(current_interval_text.strip())
-                    item = self.subtitle_listbox.item(cell_index)
+                    # After a seek forward, pad the skipped blocks so indexes stay aligned with time
+                    while self.subtitle_listbox.count() < row:
+                        self.subtitle_listbox.addItem("")
+                    self.subtitle_listbox.addItem(current_interval_text)
+                    item = self.subtitle_listbox.item(row)
                     if item is not None:
                         item.setBackground(QColor(color))
                     else:
                         print(f"Warning: Failed to add item at index {cell_index}.")
+                    if self.long_session:
+                        self.trim_subtitles()
 
                 # Scroll to the current item
-                item = self.subtitle_listbox.item(cell_index)
+                item = self.subtitle_listbox.item(cell_index - self.subtitle_first_cell)
                 if item is not None:
                     self.subtitle_listbox.scrollToItem(item)
                 else:
@@ -486,129 +721,103 @@ class VideoPlayer(QMainWindow):
         else:
             print("Warning: subtitle_listbox is not initialized.")
 
+    def add_subtitle_cell(self, row, cell_index):
+        """Insert the finished cell `cell_index` at `row` of the subtitle list."""
+        text, color = self.subtitle_cell(cell_index)
+        item = QListWidgetItem(text)
+        item.setBackground(QColor(color))
+        self.subtitle_listbox.insertItem(row, item)
+        return item
+
+    def window_subtitles(self, cell_index):
+        """Long sessions: make the subtitle list end just before `cell_index`, refilling it after seeks."""
+        first = self.subtitle_first_cell
+        end = first + self.subtitle_listbox.count()
+        if cell_index < first or cell_index > end + SUBTITLE_WINDOW_CELLS:
+            # Seeked outside the window: rebuild it ending at the new position
+            self.subtitle_listbox.clear()
+            self.subtitle_first_cell = first = max(0, cell_index - SUBTITLE_WINDOW_CELLS + 1)
+            end = first
+        for missing in range(end, cell_index):  # Cells skipped by a seek are filled from the word columns
+            self.add_subtitle_cell(missing - first, missing)
+
+    def trim_subtitles(self):
+        """Long sessions: drop the oldest cells beyond the window (scrolling up fetches them again)."""
+        while self.subtitle_listbox.count() > SUBTITLE_WINDOW_CELLS:
+            self.subtitle_listbox.takeItem(0)
+            self.subtitle_first_cell += 1
+
+    def fetch_earlier_subtitles(self, value):
+        """Long sessions: load older subtitle cells when the list is scrolled to the top."""
+        scroll_bar = self.subtitle_listbox.verticalScrollBar()
+        if not self.long_session or value != scroll_bar.minimum() or self.subtitle_first_cell == 0:
+            return
+        first = max(0, self.subtitle_first_cell - SUBTITLE_PAGE_CELLS)
+        for row, cell_index in enumerate(range(first, self.subtitle_first_cell)):
+            self.add_subtitle_cell(row, cell_index)
+        anchor = self.subtitle_listbox.item(self.subtitle_first_cell - first)
+        self.subtitle_first_cell = first
+        self.subtitle_listbox.scrollToItem(anchor, QAbstractItemView.PositionAtTop)  # Keep the view in place
+
+    def memory_counters(self):
+        """What this window holds in memory, to check that long sessions stay flat."""
+        return {
+            "rss_bytes": rss_bytes(),
+            "subtitle_cells": self.subtitle_listbox.count(),
+            "word_dicts": len(self.word_subtitles) if isinstance(self.word_subtitles, list) else 0,
+            "word_column_bytes": self.word_columns.nbytes,
+            "attention_bytes": self.attention_data.nbytes,
+            "alert_characters": (self.attentiveness_text.document().characterCount()
+                                 + self.attentiveness_all_class.document().characterCount()),
+            "search_results": self.search_results.count(),
+            "icons_cached": self.resources.icon_count(),
+        }
+
+    def log_memory(self, interval_seconds):
+        """Print memory_counters() every `interval_seconds`."""
+        def report():
+            counters = self.memory_counters()
+            details = ", ".join(f"{name}={value}" for name, value in counters.items() if name != "rss_bytes")
+            print(f"[memory] {self.windowTitle()}: rss={format_bytes(counters['rss_bytes'])}, {details}")
+
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(report)
+        self.memory_timer.start(int(interval_seconds * 1000))
+
     def load_attention_data(self):
-        """ Load attentiveness data from the CSV file. """
-        attention_data = []
-        with open(self.csv_path, 'r', encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            # Clean up column names by stripping extra spaces
-            reader.fieldnames = [field.strip() for field in reader.fieldnames]
-
-            for row in reader:
-                # Make sure the column exists
-                if 'Timestamp' in row:
-                    timestamp = int(float(row['Timestamp']))  # Convert '1.0' to 1
-                else:
-                    print("Timestamp not found in row:", row)
-                    continue  # Skip this row if 'Timestamp' is missing
-
-                person_id = row['Name']
-                state = row['State']
-                attention_data.append({
-                    "timestamp": timestamp,
-                    "person_id": person_id,
-                    "state": state
-                })
+        """ Load attentiveness data from the CSV files, normalized to one sample per student-second if asked. """
+        attention_data = self.merge_stream_attention(AttentionStore.from_csv(self.csv_path))
+        if self.normalize:
+            attention_data, report = normalize_attention(attention_data, self.normalize)
+            print("normalization=>", report)
         return attention_data
 
+    def merge_stream_attention(self, attention_data):
+        """`attention_data` plus the samples of the extra streams that have an attention CSV, matched by name."""
+        streams = [stream for stream in self.stream_sessions if stream.get("csv_path")]
+        if not streams:
+            return attention_data
+        stores = [attention_data] + [AttentionStore.from_csv(stream["csv_path"]) for stream in streams]
+        return AttentionStore.merge(stores, [0.0] + [stream.get("offset", 0.0) for stream in streams])
+
     def display_inattentive_students(self):
         """Display inattentive students with descriptive phrases, streak tracking, and colored intervals, storing the data."""
-        # Clear the previous stored data (if any)
-        self.display_data = []  # This will store the formatted data for later use
-
         grouped_data = self.group_attentiveness_by_interval(interval=60)
         print("grouped_data=>", grouped_data)
         # Initialize state tracking for streaks
         if not hasattr(self, "student_streaks"):
             self.student_streaks = {}
 
-        # Process each interval and store the data
-        for interval, students in grouped_data.items():
-            interval_text = []  # Collect all text for this interval
-            for student, stats in students.items():
-                total_count = stats["total_count"]
-                attentive_count = stats["attentive_count"]
-                attentiveness_percentage = (attentive_count / total_count * 100) if total_count > 0 else 0
-
-                # Initialize streak tracking if needed
-                if student not in self.student_streaks:
-                    self.student_streaks[student] = {"streak": 0, "last_state": "Attentive"}
-
-                # Determine the symbol, tag, and phrase based on attentiveness percentage
-                if attentiveness_percentage <= 50:
-                    # symbol = " 🚨"
-                    tag = "red"
-                    current_state = "Inattentive"
-                    phrase = f" {student}"
-                elif attentiveness_percentage <= 70:
-                    # symbol = "⚠️"
-                    tag = "yellow"
-                    current_state = "Inconsistent"
-                    phrase = f" {student}"
-                else:
-                    # symbol = "⬤"
-                    tag = "green"
-                    current_state = "Attentive"
-                    phrase = f" {student}"
-
-                # Update streak based on state
-                if current_state == self.student_streaks[student]["last_state"]:
-                    self.student_streaks[student]["streak"] += 1  # Increment streak by interval (e.g., 5 minutes)
-                else:
-                    self.student_streaks[student]["streak"] = 1  # Reset streak on state change
-
-                self.student_streaks[student]["last_state"] = current_state
-
-                # Adjust phrase to include streak information
-                streak_minutes = self.student_streaks[student]["streak"]
-                if current_state == "Inattentive":
-                    phrase += f"  totally inattentive for {streak_minutes} minutes."
-                elif current_state == "Attentive":
-                    phrase += f"  has been attentive for {streak_minutes} minutes."
-                elif current_state == "Inconsistent":  # Handle yellow state streak
-                    phrase += f"  partially inattentive for {streak_minutes} minutes."
-
-                # Append this phrase to the interval_text
-                interval_text.append((phrase, tag))
-
-            # Store the interval's data into the main display data list
-            self.display_data.append((interval, interval_text))
+        # Process each interval and store the formatted data for later use
+        self.student_rows = calculate_student_intervals(grouped_data, self.student_streaks, self.policy)
+        self.display_data = build_display_data(self.student_rows)
 
         print(f"Stored Data: {self.display_data}")  # Optional: Debugging to check the stored data
 
     def group_attentiveness_by_interval(self, interval=300):
         """Group attentiveness data into intervals for each student."""
-        grouped_data = {}
-        for entry in self.attention_data:
-            student = entry["person_id"]
-            timestamp = entry["timestamp"]
-            state = entry["state"]
-
-            # Determine the interval in seconds (e.g., 300-600 seconds)
-            interval_start = (timestamp // interval) * interval
-            interval_end = interval_start + interval
-            interval_label = f"[{interval_start // 60}-{interval_end // 60}] min"
-
-            # Initialize interval structure
-            if interval_label not in grouped_data:
-                grouped_data[interval_label] = {}
-
-            # Initialize student data
-            if student not in grouped_data[interval_label]:
-                grouped_data[interval_label][student] = {"attentive_count": 0, "total_count": 0}
-
-            # Update counts
-            if state in ["Attentive", "Confused"]:  # Treat "Confused" as "Attentive"
-                grouped_data[interval_label][student]["attentive_count"] += 1
-            grouped_data[interval_label][student]["total_count"] += 1
-
-        return grouped_data
-
-    from PIL import Image
-    from PyQt5.QtGui import QImage, QPixmap, QTextCursor, QTextCharFormat, QColor
-    import os
-    from PIL import Image
-    import os
+        return group_attentiveness_by_interval(self.attention_data, interval, self.policy)
+
     '''
     def display_text_for_selected_interval(self, interval_label):
         """Display text related to the selected interval (e.g., 0-5, 5-10, etc.)."""
@@ -733,9 +942,6 @@ class VideoPlayer(QMainWindow):
 
                 break
     '''
-    from PyQt5.QtGui import QPixmap, QTextCursor, QTextCharFormat, QColor, QTextImageFormat, QFont
-    from PyQt5.QtCore import Qt
-
     def display_text_for_selected_interval(self, interval_label):
         """Display text related to the selected interval (e.g., 0-5, 5-10, etc.)."""
         print(f"Selected interval {interval_label}")
@@ -783,8 +989,8 @@ class VideoPlayer(QMainWindow):
 
                         # Insert the icon if the tag is "red" or "yellow"
                         if tag in ("red", "yellow"):
-                            # Load the icon as a QPixmap
-                            icon_pixmap = QPixmap(icon_path)
+                            # The icon comes from the shared cache (clear() drops document resources)
+                            self.resources.add_icon(self.attentiveness_text.document(), icon_path)
 
                             # Insert the icon
                             icon_format = QTextImageFormat()
@@ -806,57 +1012,9 @@ class VideoPlayer(QMainWindow):
 
     def calculate_cumulative_data(self):
         """Calculate and store cumulative performance data for all intervals."""
-        if not hasattr(self, "cumulative_streak_data"):
-            self.cumulative_streak_data = []  # Initialize array
-
-        # Clear and recalculate cumulative data
-        self.cumulative_streak_data.clear()
-
         grouped_data = self.group_attentiveness_by_interval(interval=60)
-
-        # Variables to store cumulative counts
-        cumulative_attentive_count = 0
-        cumulative_total_count = 0
-
-        for interval_label, students in grouped_data.items():
-            interval_attentive_count = 0
-            interval_total_count = 0
-
-            # Sum counts for the current interval
-            for stats in students.values():
-                interval_total_count += stats["total_count"]
-                interval_attentive_count += stats["attentive_count"]
-
-            cumulative_total_count += interval_total_count
-            cumulative_attentive_count += interval_attentive_count
-
-            if cumulative_total_count == 0:
-                attentiveness_percentage = 0
-                current_state = "No data"
-                streak = 0
-            else:
-                attentiveness_percentage = (cumulative_attentive_count / cumulative_total_count) * 100
-
-                # Determine the current state
-                if attentiveness_percentage <= 50:
-                    current_state = "Inattentive"
-                elif attentiveness_percentage <= 70:
-                    current_state = "Inconsistent"
-                else:
-                    current_state = "Attentive"
-
-                # Determine streak
-                if not self.cumulative_streak_data:
-                    streak = 1  # First interval
-                else:
-                    _, _, last_state, last_streak = self.cumulative_streak_data[-1]
-                    streak = last_streak + 1 if current_state == last_state else 1
-
-            # Store cumulative data
-            self.cumulative_streak_data.append(
-                (interval_label, attentiveness_percentage, current_state, streak)
-            )
-            print("cumulative_streak_data=>", self.cumulative_streak_data)
+        self.cumulative_streak_data = calculate_cumulative_data(grouped_data, self.policy)
+        print("cumulative_streak_data=>", self.cumulative_streak_data)
     '''
     def display_text_for_selected_interval_cumulative(self, interval_label):
         """Display text related to the selected interval (e.g., 0-5, 5-10, etc.)."""
@@ -1012,9 +1170,6 @@ class VideoPlayer(QMainWindow):
 
                 break
     '''
-    from PyQt5.QtGui import QPixmap, QTextCursor, QTextCharFormat, QColor, QTextDocument, QTextImageFormat
-    from PyQt5.QtCore import Qt
-
     def display_text_for_selected_interval_cumulative(self, interval_label):
         """Display text related to the selected interval (e.g., 0-5, 5-10, etc.)."""
         print('cumulative_interval=>>', interval_label)
@@ -1032,18 +1187,7 @@ class VideoPlayer(QMainWindow):
                 self.cumulative_interval_processed.add(interval_label)
                 self.attentiveness_all_class.clear()  # Clear existing content
 
-                if state == "No data":
-                    phrase = "No data available for this interval."
-                    tag = "red"
-                elif state == "Inattentive":
-                    phrase = f"The class is mostly inattentive ({attentiveness_percentage:.2f}% only attentive) for {streak} minutes."
-                    tag = "red"
-                elif state == "Inconsistent":
-                    phrase = f"The class is partially inattentive ({attentiveness_percentage:.2f}% only attentive) for {streak} minutes."
-                    tag = "yellow"
-                else:
-                    phrase = f"The class is highly attentive ({attentiveness_percentage:.2f}% attentive) for {streak} minutes."
-                    tag = "green"
+                phrase, tag = cumulative_phrase(attentiveness_percentage, state, streak)
 
                 # Load 3D icons based on the tag
                 icon_path = ""
@@ -1054,8 +1198,8 @@ class VideoPlayer(QMainWindow):
                 elif tag == "green":
                     icon_path = "success_3d.png"  # Path to green success icon
 
-                # Load the icon as a QPixmap
-                icon_pixmap = QPixmap(icon_path)
+                # The icon comes from the shared cache (clear() drops document resources)
+                self.resources.add_icon(self.attentiveness_all_class.document(), icon_path)
 
                 # Insert the icon and text into the QTextEdit
                 cursor = self.attentiveness_all_class.textCursor()
@@ -1139,15 +1283,70 @@ def set_dark_theme(app):
 
 
 if __name__ == "__main__":
-    # Paths to video and audio files
-    video_path = "D:/Jan9_cropped_video_First_Grade_Zoom_try2.mp4"
-    audio_path = "D:/cropped_video_First_Grade_Zoom_7_minutes_audio.mp3"
-    csv_path = "D:/YOLO model/Jan9_cropped_video_First_Grade_Zoom_try2.csv"
-    transcription = "D:/YOLO model/First_Grade_Zoom_transcription.csv"
+    parser = argparse.ArgumentParser(description="Play class sessions alongside their attention analysis.")
+    parser.add_argument("sessions", nargs="+", help="session directories, or JSON manifests listing sessions")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve live metrics to dashboards on this port for the first window, the others "
+                             "count up from it (off by default)")
+    parser.add_argument("--decoder-threads", type=int, help="video decoding threads shared by all windows")
+    parser.add_argument("--long-session", action="store_true",
+                        help="keep words as columns and only a window of subtitle cells, for all-day recordings")
+    parser.add_argument("--memory-log", type=float, metavar="SECONDS", help="print memory counters this often")
+    parser.add_argument("--policy", help="JSON scoring policy (state weights and bands) to start with")
+    parser.add_argument("--normalize", choices=UNKNOWN_POLICIES,
+                        help="dedup and resample CSV samples to 1 Hz, handling unknown participants this way")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the event loop: print stalls, timer lateness and slot times on exit and "
+                             "write stack samples of stalls to FILE as folded stacks (for flamegraph viewers)")
+    args = parser.parse_args()
+
+    # Check every session before opening any window
+    sessions = resolve_sessions(args.sessions)
+    failed = False
+    for session in sessions:
+        for error in validate_session(session):
+            print(f"Error: {session['name']}: {error}")
+            failed = True
+    if not sessions:
+        print("Error: No sessions found.")
+    policy = None
+    if args.policy:
+        try:
+            policy = load_policy(args.policy)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error: Could not read scoring policy {args.policy}: {e}")
+            failed = True
+    if failed or not sessions:
+        sys.exit(1)
 
     # Create the application
     app = QApplication(sys.argv)
     #set_dark_theme(app)
-    player = VideoPlayer(video_path, audio_path, csv_path=csv_path, transcription_file=transcription)
-    player.show()
-    sys.exit(app.exec_())
+    resources = SharedResources(args.decoder_threads)
+    profiler = None
+    if args.profile:
+        profiler = QtProfiler()
+        profiler.install(app)
+    players = []
+    for number, session in enumerate(sessions):
+        arguments = player_arguments(session)
+        if len(sessions) > 1 and arguments["audio_path"]:
+            # pygame plays one music file at a time, so each window streams its container's audio instead
+            arguments["audio_path"] = None
+        player = VideoPlayer(**arguments, metrics_port=args.metrics_port + number if args.metrics_port else None,
+                             resources=resources, long_session=args.long_session, policy=policy,
+                             normalize=args.normalize, profiler=profiler)
+        player.setWindowTitle(f"Video Player - {session['name']}")
+        if args.memory_log:
+            player.log_memory(args.memory_log)
+        player.show()
+        players.append(player)
+    backends.preload()  # Import OpenCV/pygame while the user looks at the windows
+    exit_code = app.exec_()
+    if profiler:
+        profiler.stop(app)
+        print(profiler.report())
+        samples = profiler.write_folded(args.profile)
+        print(f"{samples} stall stack samples written to {args.profile}")
+    resources.shutdown()
+    sys.exit(exit_code)
@@ -0,0 +1,191 @@
+import argparse
+import os
+from fractions import Fraction
+
+from attention_metrics import group_attentiveness_by_interval, calculate_cumulative_data, parse_interval_label
+from attention_store import AttentionStore
+import backends
+from phrase_attention import segment_phrases
+from transcript import load_word_subtitles
+
+HIGHLIGHT_STATE = "Inattentive"  # Cumulative class state whose minutes go into the reel
+SUBTITLE_FORMATS = ("srt", "vtt")
+
+
+def state_segments(cumulative_streak_data, state=HIGHLIGHT_STATE):
+    """Merge consecutive intervals whose cumulative state is `state` into (start, end) second ranges."""
+    segments = []
+    for interval, _, interval_state, _ in cumulative_streak_data:
+        if interval_state == state:
+            start_minute, end_minute = parse_interval_label(interval)
+            segments.append((start_minute * 60, end_minute * 60))
+    segments.sort()
+
+    merged = []
+    for start, end in segments:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def copy_segments(video_path, out_path, segments):
+    """Cut `segments` out of the video into one file by copying packets, without re-encoding.
+
+    Each cut starts on the keyframe at or before the segment start and ends on the first keyframe
+    at or after its end, so every clip is a run of whole GOPs and decodes on its own. Clips that
+    would overlap after this widening are trimmed to start where the previous one ended.
+    Returns the clips actually written as (source_start, source_end, reel_start) in seconds.
+    """
+    av = backends.av()
+    clips = []
+    with av.open(video_path) as source, av.open(out_path, "w") as reel:
+        streams = [stream for stream in source.streams if stream.type in ("video", "audio")]
+        video = next((stream for stream in streams if stream.type == "video"), None)
+        if video is None:
+            raise ValueError(f"{video_path} has no video stream")
+        has_audio = any(stream.type == "audio" for stream in streams)
+        out_streams = {stream.index: reel.add_stream_from_template(stream) for stream in streams}
+
+        reel_time = Fraction(0)
+        lead = None  # Decode delay of the first keyframe, added to everything so no dts goes negative
+        for start, end in segments:
+            if clips and start < clips[-1][1]:
+                start = clips[-1][1]
+            if start >= end:
+                continue
+            source.seek(int(start / video.time_base), stream=video, backward=True, any_frame=False)
+
+            clip_start = clip_end = None
+            pending = []  # Audio past the segment end, kept until we know where the clip ends
+            for packet in source.demux(streams):
+                if packet.dts is None or packet.pts is None:
+                    continue  # Demuxer flush packets
+                packet_time = packet.pts * packet.time_base
+                is_video = packet.stream.index == video.index
+                if clip_start is None:
+                    if not (is_video and packet.is_keyframe):
+                        continue  # Nothing is kept before the first keyframe
+                    clip_start = packet_time
+                    if lead is None:
+                        lead = max(Fraction(0), (packet.pts - packet.dts) * packet.time_base)
+                if is_video:
+                    if clip_end is None and packet.is_keyframe and packet_time >= end and packet_time > clip_start:
+                        clip_end = packet_time
+                        pending = [queued for queued in pending if queued.pts * queued.time_base < clip_end]
+                        for queued in pending:
+                            _mux(reel, out_streams, queued, reel_time + lead - clip_start)
+                        pending = []
+                    if clip_end is not None:
+                        if not has_audio:
+                            break
+                        continue
+                else:
+                    if packet_time < clip_start:
+                        continue
+                    if clip_end is not None:
+                        if packet_time >= clip_end:
+                            break  # Audio has caught up with the cut
+                        continue
+                    if packet_time >= end:
+                        pending.append(packet)
+                        continue
+                _mux(reel, out_streams, packet, reel_time + lead - clip_start)
+
+            if clip_start is None:
+                continue  # Seeked past the end of the video
+            if clip_end is None:  # The video ended inside the segment
+                clip_end = Fraction(source.duration or 0, 1000000) if source.duration else Fraction(end)
+                for queued in pending:
+                    _mux(reel, out_streams, queued, reel_time + lead - clip_start)
+            clips.append((float(clip_start), float(clip_end), float(reel_time + lead)))
+            reel_time += clip_end - clip_start
+    return clips
+
+
+def _mux(reel, out_streams, packet, offset):
+    """Shift `packet` by `offset` seconds and write it to its stream in the reel."""
+    ticks = round(offset / packet.time_base)
+    packet.pts += ticks
+    packet.dts += ticks
+    packet.stream = out_streams[packet.stream.index]
+    reel.mux(packet)
+
+
+def reel_cues(word_subtitles, clips):
+    """Subtitle cues for the reel: the words spoken in each clip, grouped into phrases and re-timed."""
+    cues = []
+    for source_start, source_end, reel_start in clips:
+        shift = reel_start - source_start
+        words = [dict(word, start=word["start"] + shift, end=min(word["end"], source_end) + shift)
+                 for word in word_subtitles if source_start <= word["start"] < source_end]
+        cues.extend(segment_phrases(words))
+    return cues
+
+
+def _cue_timestamp(seconds, separator):
+    milliseconds = int(round(max(0.0, seconds) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def write_subtitles(cues, path, subtitle_format):
+    """Write cues as an SRT or WebVTT sidecar file."""
+    separator = "," if subtitle_format == "srt" else "."
+    with open(path, 'w', encoding="utf-8") as f:
+        if subtitle_format == "vtt":
+            f.write("WEBVTT\n\n")
+        for number, cue in enumerate(cues, start=1):
+            if subtitle_format == "srt":
+                f.write(f"{number}\n")
+            f.write(f"{_cue_timestamp(cue['start'], separator)} --> {_cue_timestamp(cue['end'], separator)}\n")
+            f.write(f"{cue['text']}\n\n")
+
+
+def export_highlight_reel(video_path, out_path, cumulative_streak_data, word_subtitles, state=HIGHLIGHT_STATE,
+                          subtitle_formats=SUBTITLE_FORMATS):
+    """Export every minute the class was in `state` as one video plus subtitle sidecars.
+
+    Returns the clips written (see copy_segments); an empty list means no minute matched and no
+    files were written.
+    """
+    segments = state_segments(cumulative_streak_data, state)
+    if not segments:
+        return []
+    clips = copy_segments(video_path, out_path, segments)
+    cues = reel_cues(word_subtitles, clips)
+    for subtitle_format in subtitle_formats:
+        write_subtitles(cues, os.path.splitext(out_path)[0] + "." + subtitle_format, subtitle_format)
+    return clips
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cut the minutes a class was inattentive into a highlight reel.")
+    parser.add_argument("video_path", help="source video")
+    parser.add_argument("out_path", help="reel to write, e.g. reel.mp4 (subtitles go next to it)")
+    parser.add_argument("--csv", help="attention CSV (Timestamp, Name, State)")
+    parser.add_argument("--transcription", help="word transcription CSV (Word, Start Time, End Time)")
+    parser.add_argument("--archive", help="session archive to read instead of the CSVs")
+    parser.add_argument("--state", default=HIGHLIGHT_STATE, choices=["Inattentive", "Inconsistent", "Attentive"])
+    parser.add_argument("--subtitles", default="both", choices=["srt", "vtt", "both", "none"])
+    args = parser.parse_args()
+
+    if args.archive:
+        from session_archive import load_session_archive
+        archive = load_session_archive(args.archive)
+        cumulative, words = archive.cumulative_streak_data, archive.word_subtitles
+    elif args.csv:
+        cumulative = calculate_cumulative_data(group_attentiveness_by_interval(AttentionStore.from_csv(args.csv), 60))
+        words = load_word_subtitles(args.transcription) if args.transcription else []
+    else:
+        parser.error("give --archive or --csv")
+
+    formats = {"both": SUBTITLE_FORMATS, "none": ()}.get(args.subtitles, (args.subtitles,))
+    clips = export_highlight_reel(args.video_path, args.out_path, cumulative, words, args.state, formats)
+    if not clips:
+        print(f"No minutes were {args.state}; nothing exported.")
+    for source_start, source_end, reel_start in clips:
+        print(f"{source_start:8.2f}-{source_end:8.2f} s -> reel {reel_start:8.2f} s")
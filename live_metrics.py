@@ -0,0 +1,276 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from attention_metrics import group_attentiveness_by_interval, calculate_student_intervals, build_display_data, \
+    calculate_cumulative_data, cumulative_phrase, parse_interval_label
+from attention_store import AttentionState, AttentionStore, StudentRegistry
+from phrase_attention import attention_drop_report
+from scoring_policy import DEFAULT_POLICY
+from transcript import format_timestamp, WordColumns
+
+CELL_SECONDS = 10  # Subtitle cells cover 10-second blocks, as in VideoPlayer.display_words
+SEVERITY_BY_TAG = {"red": "high", "yellow": "medium", "green": "low"}
+
+
+def alert_interval_label(current_time):
+    """Label of the interval whose alerts are shown at `current_time` (the previous full minute)."""
+    interval_start = ((current_time // 60) * 60) - 60
+    interval_end = interval_start + 60
+    return f"[{interval_start // 60:.0f}-{interval_end // 60:.0f}] min"
+
+
+class SessionMetrics:
+    """Per-position dashboard metrics for one session, built from VideoPlayer's precomputed data.
+
+    Alerts for an interval become visible when the interval ends, matching when the alert panes
+    update during playback. Cell texts and percentages for finished cells are memoized, so a
+    snapshot only recomputes the cell currently being spoken. Percentages are weighted by
+    `policy`, the one the rows and alerts were classified with.
+    """
+
+    def __init__(self, attention_data, word_subtitles, student_rows, cumulative_streak_data, policy=DEFAULT_POLICY):
+        self.attention_data = attention_data
+        self.policy = policy
+        # Columns, not dicts: in long-session mode the player's WordColumns is shared as is
+        self.words = word_subtitles if isinstance(word_subtitles, WordColumns) \
+            else WordColumns.from_word_subtitles(word_subtitles)
+        self.word_starts = self.words.starts
+        self.student_rows = []
+        self.students_total = len(attention_data.registry) - 1  # Excluding the 'unknown' participant
+        self._cell_cache = {}
+        self._phrase_report = None
+        self.rows_by_interval = {}
+        self.alerts = []
+        self.alert_times = []
+        self.add_intervals(student_rows, cumulative_streak_data)
+
+    def add_intervals(self, student_rows, cumulative_streak_data):
+        """Add the rows and alerts of intervals after those already known (live sessions add them as they end)."""
+        self.student_rows.extend(student_rows)
+        for row in student_rows:
+            self.rows_by_interval.setdefault(row["interval"], []).append(row)
+
+        # Alerts in the order they appear: per interval, the class message first, then students
+        cumulative_by_interval = {row[0]: row[1:] for row in cumulative_streak_data}
+        for interval, phrases in build_display_data(student_rows):
+            shown_at = parse_interval_label(interval)[1] * 60
+            if interval in cumulative_by_interval:
+                phrase, tag = cumulative_phrase(*cumulative_by_interval[interval])
+                self._add_alert(shown_at, phrase, tag)
+            for phrase, tag in phrases:
+                if tag in ("red", "yellow"):
+                    self._add_alert(shown_at, phrase.strip(), tag)
+
+    def _add_alert(self, shown_at, message, tag):
+        self.alert_times.append(shown_at)
+        self.alerts.append({
+            "id": len(self.alerts),
+            "time": shown_at,
+            "message": message,
+            "severity": SEVERITY_BY_TAG[tag],
+            "timestamp": format_timestamp(shown_at),
+        })
+
+    def cell(self, cell_index, current_time):
+        """Transcript cell for the 10-second block `cell_index`, with words spoken by `current_time`."""
+        cell_start = cell_index * CELL_SECONDS
+        cell_end = cell_start + CELL_SECONDS
+        finished = current_time >= cell_end
+        if finished and cell_index in self._cell_cache:
+            return self._cell_cache[cell_index]
+
+        lo = int(np.searchsorted(self.word_starts, cell_start))
+        if finished:
+            hi = int(np.searchsorted(self.word_starts, cell_end))
+        else:
+            hi = int(np.searchsorted(self.word_starts, current_time, side="right"))
+        cell = {
+            "id": cell_index,
+            "text": " ".join(word["word"] for word in self.words[lo:max(lo, hi)]),
+            "attention": round(self.policy.percentage(self.attention_data.state_counts(cell_start, cell_end))),
+            "timestamp": format_timestamp(cell_start),
+        }
+        if finished:
+            self._cell_cache[cell_index] = cell
+        return cell
+
+    def rates(self, current_time):
+        """Attention and comprehension rates (percent) for the current 10-second cell.
+
+        Attention weights the samples by the scoring policy (by default Attentive and Confused both
+        count); comprehension is the share of that weighted attention coming from Attentive samples.
+        """
+        cell_start = (current_time // CELL_SECONDS) * CELL_SECONDS
+        counts = self.attention_data.state_counts(cell_start, cell_start + CELL_SECONDS)
+        attentive = self.policy.weighted_counts(counts)
+        attention_rate = self.policy.percentage(counts)
+        understood = counts[AttentionState.ATTENTIVE] * self.policy.weights[AttentionState.ATTENTIVE]
+        comprehension_rate = understood / attentive * 100 if attentive else 0
+        return round(attention_rate), round(comprehension_rate)
+
+    def active_students(self, current_time):
+        """Students classified Attentive in the interval currently shown in the alert panes."""
+        rows = self.rows_by_interval.get(alert_interval_label(current_time), [])
+        return sum(1 for row in rows
+                   if row["state"] == "Attentive" and row["student"] != StudentRegistry.UNKNOWN_NAME)
+
+    def phrase_report(self):
+        """Phrases ranked by attention drop (see phrase_attention), computed on first use."""
+        if self._phrase_report is None:
+            self._phrase_report = attention_drop_report(self.words, self.attention_data, policy=self.policy)
+        return self._phrase_report
+
+    def metrics(self, current_time):
+        """Scalar dashboard metrics at `current_time`."""
+        attention_rate, comprehension_rate = self.rates(current_time)
+        return {
+            "interval": alert_interval_label(current_time),
+            "attentionRate": attention_rate,
+            "comprehensionRate": comprehension_rate,
+            "activeStudents": self.active_students(current_time),
+            "totalStudents": self.students_total,
+        }
+
+    def alert_count(self, current_time):
+        """Number of alerts visible at `current_time`."""
+        return bisect_right(self.alert_times, current_time)
+
+    def snapshot(self, current_time):
+        """Everything the dashboard shows at `current_time`, as a JSON-serialisable dict."""
+        current_cell = int(current_time // CELL_SECONDS)
+        return {
+            "time": round(current_time, 3),
+            "metrics": self.metrics(current_time),
+            "transcription": [self.cell(index, current_time) for index in range(current_cell + 1)],
+            "alerts": self.alerts[:self.alert_count(current_time)],
+        }
+
+
+class MetricsStream:
+    """Turns successive playback positions into dashboard messages with stable item ids.
+
+    advance() returns a "delta" message holding only what changed since the previous position:
+    appended or updated transcript cells (id = 10-second cell index), appended alerts and changed
+    metrics. reset() describes the whole state, for clients that connect or fall behind; a seek
+    backwards produces a reset as well. Every message carries a sequence number so clients can
+    discard deltas older than their last reset.
+    """
+
+    def __init__(self, session_metrics):
+        self.session_metrics = session_metrics
+        self.seq = 0
+        self.current_time = None
+        self._metrics = None
+        self._cell_count = 0
+        self._last_cell = None
+        self._alert_count = 0
+
+    def reset(self):
+        """Full state at the last reported position."""
+        if self.current_time is None:
+            return {"type": "reset", "seq": self.seq, "time": None, "metrics": None, "transcription": [], "alerts": []}
+        message = self.session_metrics.snapshot(self.current_time)
+        message.update(type="reset", seq=self.seq)
+        return message
+
+    def advance(self, current_time):
+        """Move to `current_time`; returns the message to send, or None if nothing changed."""
+        session_metrics = self.session_metrics
+        if self.current_time is not None and current_time < self.current_time:
+            # Seeking backwards: rebuild the state and resynchronise everyone
+            self._sync(current_time)
+            self.seq += 1
+            return self.reset()
+
+        message = {}
+        metrics = session_metrics.metrics(current_time)
+        if metrics != self._metrics:
+            message["metrics"] = self._metrics = metrics
+
+        cell_count = int(current_time // CELL_SECONDS) + 1
+        updated = []
+        if self._cell_count:
+            cell = session_metrics.cell(self._cell_count - 1, current_time)
+            if cell != self._last_cell:
+                updated.append(cell)
+                self._last_cell = cell
+        appended = [session_metrics.cell(index, current_time) for index in range(self._cell_count, cell_count)]
+        if appended:
+            self._cell_count = cell_count
+            self._last_cell = appended[-1]
+        if updated or appended:
+            message["transcription"] = {"append": appended, "update": updated}
+
+        alert_count = session_metrics.alert_count(current_time)
+        if alert_count > self._alert_count:
+            message["alerts"] = {"append": session_metrics.alerts[self._alert_count:alert_count], "update": []}
+            self._alert_count = alert_count
+
+        self.current_time = current_time
+        if not message:
+            return None
+        self.seq += 1
+        message.update(type="delta", seq=self.seq, time=round(current_time, 3))
+        return message
+
+    def set_session_metrics(self, session_metrics):
+        """Switch to metrics built another way (e.g. under a new scoring policy); returns the reset to send."""
+        self.session_metrics = session_metrics
+        if self.current_time is not None:
+            self._sync(self.current_time)
+        self.seq += 1  # Clients drop messages numbered at or below their last reset
+        return self.reset()
+
+    def _sync(self, current_time):
+        session_metrics = self.session_metrics
+        self.current_time = current_time
+        self._metrics = session_metrics.metrics(current_time)
+        self._cell_count = int(current_time // CELL_SECONDS) + 1
+        self._last_cell = session_metrics.cell(self._cell_count - 1, current_time)
+        self._alert_count = session_metrics.alert_count(current_time)
+
+
+class LiveSession:
+    """Dashboard metrics for a class in progress.
+
+    Samples are appended as the detector produces them (ingest). When the clock passes the end of
+    an interval, that interval alone is grouped and classified, continuing the students' streaks,
+    and its rows and alerts are added to the session metrics; advance() then returns the dashboard
+    delta like MetricsStream. Once the whole class has been fed in, the rows and alerts match those
+    computed offline from the full CSV.
+    """
+
+    def __init__(self, registry, word_subtitles, policy=DEFAULT_POLICY, interval=60):
+        self.attention_data = AttentionStore([], [], [], registry)
+        self.session_metrics = SessionMetrics(self.attention_data, word_subtitles, [], [], policy)
+        self.stream = MetricsStream(self.session_metrics)
+        self.policy = policy
+        self.interval = interval
+        self.grouped_data = {}
+        self.student_streaks = {}
+        self.closed_intervals = 0
+
+    def ingest(self, timestamps, student_ids, states):
+        """Add detector samples; student ids come from the session's registry."""
+        self.attention_data.append(timestamps, student_ids, states)
+
+    def close_interval(self):
+        """Classify the next interval that ended and publish its rows and alerts."""
+        data = self.attention_data
+        start = self.closed_intervals * self.interval
+        window = data.time_slice(start, start + self.interval - 1)
+        interval_data = AttentionStore(data.timestamps[window], data.student_ids[window], data.states[window],
+                                       data.registry, presorted=True)
+        grouped_data = group_attentiveness_by_interval(interval_data, self.interval, self.policy)
+        rows = calculate_student_intervals(grouped_data, self.student_streaks, self.policy)
+        self.grouped_data.update(grouped_data)
+        cumulative = calculate_cumulative_data(self.grouped_data, self.policy)
+        self.session_metrics.add_intervals(rows, cumulative[len(cumulative) - len(grouped_data):])
+        self.closed_intervals += 1
+
+    def advance(self, current_time):
+        """Close the intervals that ended by `current_time`; returns the dashboard delta, or None."""
+        while (self.closed_intervals + 1) * self.interval <= current_time:
+            self.close_interval()
+        return self.stream.advance(current_time)
@@ -0,0 +1,260 @@
+import itertools
+import queue
+import threading
+import time
+
+import backends
+
+CHUNK_SECONDS = 0.2  # Length of each buffer handed to the mixer
+BUFFERED_CHUNKS = 10  # Decoded audio kept ahead of playback (~2 s)
+FEED_POLL_SECONDS = 0.005
+
+_channel_numbers = itertools.count()  # Each container clock gets its own mixer channel
+
+
+class MusicFileClock:
+    """Plays a separately extracted audio file through pygame.mixer.music and reports its position."""
+
+    def __init__(self, audio_path):
+        self.audio_path = audio_path
+        self.offset = 0.0  # get_pos() restarts from 0 on every play(), so remember where we started
+
+    def start(self, start_time=0.0):
+        pygame = backends.pygame()
+        pygame.mixer.init()
+        pygame.mixer.music.load(self.audio_path)
+        self.seek(start_time)
+
+    def seek(self, seconds):
+        pygame = backends.pygame()
+        pygame.mixer.music.play(start=seconds)
+        self.offset = seconds
+
+    def position(self):
+        """Current media time in seconds, or None if audio is not playing."""
+        pygame = backends.pygame()
+        if pygame.mixer.get_init() is None:  # get_pos() raises before start()
+            return None
+        audio_time_ms = pygame.mixer.music.get_pos()  # Audio time in milliseconds
+        if audio_time_ms == -1:
+            return None
+        return self.offset + audio_time_ms / 1000.0
+
+    def is_playing(self):
+        pygame = backends.pygame()
+        return pygame.mixer.get_init() is not None and pygame.mixer.music.get_busy()
+
+    def stop(self):
+        pygame = backends.pygame()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+
+
+class WallClock:
+    """Media clock for videos without sound: the last start or seek target plus the wall time since then."""
+
+    def __init__(self):
+        self.offset = 0.0
+        self._started_at = None
+
+    def start(self, start_time=0.0):
+        self.seek(start_time)
+
+    def seek(self, seconds):
+        self.offset = seconds
+        self._started_at = time.perf_counter()
+
+    def position(self):
+        if self._started_at is None:
+            return None
+        return self.offset + time.perf_counter() - self._started_at
+
+    def is_playing(self):
+        return self._started_at is not None  # The video's frame count decides when playback ends
+
+    def stop(self):
+        self._started_at = None
+
+
+class ContainerAudioClock:
+    """Decodes the audio track straight from the video container and streams it to the mixer.
+
+    A background thread demuxes and decodes the audio stream with PyAV, resamples it to the mixer's
+    format and queues short pygame Sounds on one mixer channel. Each chunk keeps the presentation
+    time of its first sample, and the clock is that time plus how long the chunk has been playing,
+    so the media clock comes from the container's own timestamps. A container without an audio
+    track falls back to a WallClock.
+    """
+
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self._chunks = queue.Queue(BUFFERED_CHUNKS)
+        self._thread = None
+        self._stop = threading.Event()
+        self._decoder_done = threading.Event()
+        self._lock = threading.Lock()
+        self._channel = None
+        self._channel_number = next(_channel_numbers)
+        self._chunk_pts = None  # Media time of the chunk currently playing
+        self._chunk_duration = 0.0
+        self._chunk_started_at = 0.0
+        self._has_audio = None  # Probed on the first start()
+        self._wall_clock = None  # Set when there is no audio track to follow
+
+    def start(self, start_time=0.0):
+        self._av = backends.av()
+        if self._has_audio is None:
+            self._has_audio = self._probe_audio()
+        if not self._has_audio:
+            self._wall_clock = self._wall_clock or WallClock()
+            self._wall_clock.start(start_time)
+            return
+        pygame = backends.pygame()
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=44100, size=-16, channels=2)
+        if pygame.mixer.get_num_channels() <= self._channel_number:
+            pygame.mixer.set_num_channels(self._channel_number + 1)
+        self._channel = pygame.mixer.Channel(self._channel_number)
+        self.seek(start_time)
+
+    def _probe_audio(self):
+        try:
+            with self._av.open(self.video_path) as container:
+                if container.streams.audio:
+                    return True
+        except self._av.error.FFmpegError as e:
+            print(f"Error: Could not read {self.video_path}: {e}")
+            return False
+        print(f"Warning: {self.video_path} has no audio track; playing it against the wall clock.")
+        return False
+
+    def seek(self, seconds):
+        if self._wall_clock is not None:
+            self._wall_clock.seek(seconds)
+            return
+        self._shutdown()
+        self._stop.clear()
+        self._decoder_done.clear()
+        self._chunks = queue.Queue(BUFFERED_CHUNKS)
+        with self._lock:
+            self._chunk_pts = None
+        self._thread = threading.Thread(target=self._run, args=(seconds,), name="audio-feed", daemon=True)
+        self._thread.start()
+
+    def position(self):
+        """Current media time in seconds, or None before the first chunk plays."""
+        if self._wall_clock is not None:
+            return self._wall_clock.position()
+        with self._lock:
+            if self._chunk_pts is None:
+                return None
+            elapsed = min(time.monotonic() - self._chunk_started_at, self._chunk_duration)
+            return self._chunk_pts + elapsed
+
+    def is_playing(self):
+        if self._wall_clock is not None:
+            return self._wall_clock.is_playing()
+        if self._thread is None:
+            return False
+        # Still starting up, still decoding, or the last chunks are still audible
+        return not self._decoder_done.is_set() or not self._chunks.empty() or self._channel.get_busy()
+
+    def stop(self):
+        if self._wall_clock is not None:
+            self._wall_clock.stop()
+            return
+        self._shutdown()
+        self._thread = None
+
+    def _shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._channel is not None:
+            self._channel.stop()
+
+    def _run(self, start_time):
+        decoder = threading.Thread(target=self._decode, args=(start_time,), name="audio-demux", daemon=True)
+        decoder.start()
+        self._feed()
+        decoder.join(timeout=2)
+
+    def _decode(self, start_time):
+        """Demux and decode audio into mixer-ready chunks of (pts, duration, Sound)."""
+        pygame = backends.pygame()
+        av = self._av
+        frequency, _, channels = pygame.mixer.get_init()
+        frame_bytes = channels * 2  # One s16 sample per channel
+        bytes_per_second = frequency * frame_bytes
+        chunk_bytes = int(frequency * CHUNK_SECONDS) * frame_bytes
+        resampler = av.AudioResampler(format="s16", layout="stereo" if channels == 2 else "mono", rate=frequency)
+
+        buffer = bytearray()
+        buffer_pts = None
+        try:
+            with av.open(self.video_path) as container:
+                stream = container.streams.audio[0]
+                if start_time > 0:
+                    container.seek(int(start_time / stream.time_base), stream=stream)
+                for packet in container.demux(stream):
+                    for frame in packet.decode():
+                        if self._stop.is_set():
+                            return
+                        frame_time = frame.time if frame.time is not None else start_time
+                        if frame_time + frame.samples / frame.sample_rate <= start_time:
+                            continue  # Seeks land on the packet before the target
+                        for resampled in resampler.resample(frame):
+                            data = resampled.to_ndarray().tobytes()
+                            if buffer_pts is None:
+                                buffer_pts = max(frame_time, start_time)
+                                # Trim the part of the first frame that lies before the seek target
+                                data = data[int((buffer_pts - frame_time) * frequency) * frame_bytes:]
+                            buffer += data
+                            while len(buffer) >= chunk_bytes:
+                                self._put_chunk(buffer_pts, bytes(buffer[:chunk_bytes]), bytes_per_second)
+                                del buffer[:chunk_bytes]
+                                buffer_pts += chunk_bytes / bytes_per_second
+                if buffer:
+                    self._put_chunk(buffer_pts, bytes(buffer), bytes_per_second)
+        except (av.error.FFmpegError, IndexError) as e:
+            print(f"Error: Could not decode audio from {self.video_path}: {e}")
+        finally:
+            self._decoder_done.set()
+
+    def _put_chunk(self, pts, data, bytes_per_second):
+        pygame = backends.pygame()
+        chunk = (pts, len(data) / bytes_per_second, pygame.mixer.Sound(buffer=data))
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _feed(self):
+        """Keep one chunk queued behind the playing one and note when each starts playing."""
+        queued = None
+        while not self._stop.is_set():
+            if queued is not None and self._channel.get_queue() is None:
+                self._started(queued)  # The queued chunk has moved to the front
+                queued = None
+            if queued is None:
+                try:
+                    chunk = self._chunks.get(timeout=FEED_POLL_SECONDS)
+                except queue.Empty:
+                    if self._decoder_done.is_set() and not self._channel.get_busy():
+                        return
+                    continue
+                if self._channel.get_busy():
+                    self._channel.queue(chunk[2])
+                    queued = chunk
+                else:
+                    self._channel.play(chunk[2])  # First chunk, or the decoder fell behind
+                    self._started(chunk)
+                continue
+            time.sleep(FEED_POLL_SECONDS)
+
+    def _started(self, chunk):
+        with self._lock:
+            self._chunk_pts, self._chunk_duration, _ = chunk
+            self._chunk_started_at = time.monotonic()
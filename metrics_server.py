@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+
+from live_metrics import MetricsStream
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_CLIENT_FRAME = 64 * 1024  # Clients only send control frames; anything bigger is dropped
+CLIENT_QUEUE_SIZE = 16  # Clients further behind than this are resynchronised with a reset
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def encode_frame(payload, opcode=OP_TEXT):
+    """Build an unmasked server-to-client WebSocket frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_frame(reader):
+    """Read one client frame and return (opcode, payload)."""
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_CLIENT_FRAME:
+        raise ConnectionError(f"Client frame too large ({length} bytes)")
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    payload = await reader.readexactly(length)
+    return opcode, bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+
+class MetricsHub:
+    """Local HTTP/WebSocket server streaming dashboard updates to any number of clients.
+
+    The hub runs its own asyncio loop in a daemon thread. The playback loop only reports its
+    position with publish_position(); the resulting delta (see live_metrics.MetricsStream) is
+    computed, serialised and framed once on the hub's thread and the same bytes are queued to every
+    client. New clients, and clients whose queue overflows, get a full reset message instead.
+    Endpoints:
+
+        GET /metrics  current full state as JSON
+        GET /phrases  phrases ranked by attention drop, shaped like dashboard transcript rows
+        GET /ws       WebSocket stream: one reset, then deltas
+    """
+
+    def __init__(self, metrics, host="127.0.0.1", port=8765):
+        self.stream = MetricsStream(metrics)
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self._reset_cache = (None, None)  # (seq, json) of the last reset built
+        self._pending_time = None
+        self._pending_lock = threading.Lock()
+        self._loop = None
+        self._stopped = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None  # Why the hub thread could not start serving
+
+    def start(self):
+        """Start serving on a background thread; returns once the socket is listening.
+
+        Raises OSError if the port cannot be bound (e.g. another player already uses it).
+        """
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name="metrics-hub", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+
+    def stop(self):
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            self._thread.join(timeout=5)
+
+    def publish_position(self, current_time):
+        """Report the playback position; safe to call from any thread, at any rate.
+
+        Calls arriving faster than the hub can compute snapshots are coalesced to the latest one.
+        """
+        if self._loop is None:
+            return
+        with self._pending_lock:
+            scheduled = self._pending_time is not None
+            self._pending_time = current_time
+        if not scheduled:
+            self._loop.call_soon_threadsafe(self._update)
+
+    def set_metrics(self, metrics):
+        """Serve `metrics` from now on (e.g. re-scored under another policy); every client gets a reset."""
+        if self._loop is None:
+            self.stream.set_session_metrics(metrics)
+            return
+        self._loop.call_soon_threadsafe(lambda: self.broadcast(self.stream.set_session_metrics(metrics)))
+
+    def _update(self):
+        with self._pending_lock:
+            current_time, self._pending_time = self._pending_time, None
+        if current_time is None:
+            return
+        message = self.stream.advance(current_time)
+        if message is not None:
+            self.broadcast(message)
+
+    def reset_json(self):
+        """Full-state message for the current sequence number, built at most once per update."""
+        seq, data = self._reset_cache
+        if seq != self.stream.seq:
+            data = json.dumps(self.stream.reset(), separators=(",", ":")).encode("utf-8")
+            self._reset_cache = (self.stream.seq, data)
+        return data
+
+    def broadcast(self, message):
+        """Serialise a message once and fan it out to every client (hub thread only)."""
+        frame = encode_frame(json.dumps(message, separators=(",", ":")).encode("utf-8"))
+        for queue in self.clients:
+            if queue.full():
+                # The client missed too much; replace its backlog with the current full state
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(encode_frame(self.reset_json()))
+            else:
+                queue.put_nowait(frame)
+
+    async def _serve(self):
+        try:
+            server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            self._stopped = asyncio.Event()
+            self._loop = asyncio.get_running_loop()  # Only now can updates be scheduled
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()  # start() must wake up whether or not the bind worked
+        print(f"Metrics server listening on http://{self.host}:{self.port} (WebSocket: /ws)")
+        async with server:
+            await self._stopped.wait()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            path = request_line[1] if len(request_line) > 1 else "/"
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_websocket(reader, writer, headers)
+            elif path == "/metrics":
+                self._write_http(writer, "200 OK", self.reset_json(), "application/json")
+            elif path == "/phrases":
+                report = self.stream.session_metrics.phrase_report()
+                self._write_http(writer, "200 OK", json.dumps(report).encode("utf-8"), "application/json")
+            else:
+                self._write_http(writer, "404 Not Found", b"Not found", "text/plain")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_http(writer, status, body, content_type):
+        writer.write((f"HTTP/1.1 {status}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Access-Control-Allow-Origin: *\r\n"
+                      "Connection: close\r\n\r\n").encode("latin-1") + body)
+
+    async def _serve_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\n"
+                      "Connection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+
+        queue = asyncio.Queue(CLIENT_QUEUE_SIZE)
+        queue.put_nowait(encode_frame(self.reset_json()))  # New clients start from the current state
+        self.clients.add(queue)
+        sender = asyncio.ensure_future(self._send_loop(writer, queue))
+        try:
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == OP_CLOSE:
+                    writer.write(encode_frame(payload[:2], OP_CLOSE))
+                    break
+                if opcode == OP_PING:
+                    writer.write(encode_frame(payload, OP_PONG))
+        finally:
+            self.clients.discard(queue)
+            sender.cancel()
+
+    @staticmethod
+    async def _send_loop(writer, queue):
+        while True:
+            writer.write(await queue.get())
+            await writer.drain()
+
+
+if __name__ == "__main__":
+    from attention_metrics import group_attentiveness_by_interval, calculate_student_intervals, \
+        calculate_cumulative_data
+    from attention_store import AttentionStore
+    from live_metrics import SessionMetrics
+    from transcript import load_word_subtitles
+
+    parser = argparse.ArgumentParser(description="Replay a session's metrics to dashboard clients without the player.")
+    parser.add_argument("csv_path", help="attention CSV (Timestamp, Name, State)")
+    parser.add_argument("transcription_file", help="word transcription CSV (Word, Start Time, End Time)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier")
+    args = parser.parse_args()
+
+    attention_data = AttentionStore.from_csv(args.csv_path)
+    grouped_data = group_attentiveness_by_interval(attention_data, interval=60)
+    session_metrics = SessionMetrics(attention_data, load_word_subtitles(args.transcription_file),
+                                     calculate_student_intervals(grouped_data), calculate_cumulative_data(grouped_data))
+    hub = MetricsHub(session_metrics, port=args.port)
+    hub.start()
+
+    end_time = max(int(attention_data.timestamps[-1]) if len(attention_data) else 0,
+                   int(session_metrics.word_starts[-1]) if len(session_metrics.word_starts) else 0)
+    started = time.monotonic()
+    while (current_time := (time.monotonic() - started) * args.speed) <= end_time:
+        hub.publish_position(current_time)
+        time.sleep(0.1)
+    hub.stop()
@@ -0,0 +1,103 @@
+import argparse
+
+from attention_store import AttentionStore
+from scoring_policy import DEFAULT_POLICY
+from transcript import load_word_subtitles, format_timestamp
+
+PAUSE_SECONDS = 0.6  # A gap this long between words starts a new phrase
+MAX_PHRASE_WORDS = 40  # Split run-on speech so one phrase never spans minutes
+SENTENCE_END = (".", "?", "!")
+BASELINE_PHRASES = 3  # Drops are measured against the average of this many preceding phrases
+
+
+def segment_phrases(word_subtitles, pause_seconds=PAUSE_SECONDS, max_words=MAX_PHRASE_WORDS):
+    """Split words into phrases at pauses and sentence-ending punctuation.
+
+    Returns a list of {"start", "end", "text"} dicts in time order.
+    """
+    phrases = []
+    current = []
+    for word in sorted(word_subtitles, key=lambda word: word["start"]):
+        if current and (word["start"] - current[-1]["end"] >= pause_seconds or len(current) >= max_words):
+            phrases.append(current)
+            current = []
+        current.append(word)
+        if word["word"].rstrip('"\'').endswith(SENTENCE_END):
+            phrases.append(current)
+            current = []
+    if current:
+        phrases.append(current)
+
+    return [{"start": words[0]["start"],
+             "end": words[-1]["end"],
+             "text": " ".join(word["word"] for word in words)}
+            for words in phrases]
+
+
+def join_attention(phrases, attention_data, policy=DEFAULT_POLICY):
+    """Attach attentive (weighted by `policy`) and total sample counts to each phrase with one merge pass.
+
+    Both streams are sorted by time. A sample at second t covers [t, t + 1) and belongs to every
+    phrase it overlaps. The scan start only moves forward, so each sample is visited about once
+    (a sample straddling two phrases is counted for both).
+    """
+    timestamps = attention_data.timestamps.tolist()
+    attentive = policy.weights[attention_data.states].tolist()  # Each sample's attentive weight
+    n_samples = len(timestamps)
+
+    lo = 0
+    for phrase in phrases:
+        # Skip samples that end before this phrase starts
+        while lo < n_samples and timestamps[lo] + 1 <= phrase["start"]:
+            lo += 1
+        attentive_count = total_count = 0
+        i = lo
+        while i < n_samples and timestamps[i] < phrase["end"]:
+            total_count += 1
+            attentive_count += attentive[i]
+            i += 1
+        phrase["attentive_count"] = int(attentive_count) if float(attentive_count).is_integer() else attentive_count
+        phrase["total_count"] = total_count
+        phrase["attention"] = attentive_count / total_count * 100 if total_count else None
+    return phrases
+
+
+def attention_drop_report(word_subtitles, attention_data, baseline_phrases=BASELINE_PHRASES,
+                          policy=DEFAULT_POLICY):
+    """Rank phrases by how far class attention fell below the phrases just before them.
+
+    Each row has the phrase's id (its position in the lesson), start/end, text, attention,
+    baseline and drop (baseline - attention, in percentage points), plus a dashboard-style
+    timestamp. Phrases without samples are left out.
+    """
+    phrases = join_attention(segment_phrases(word_subtitles), attention_data, policy)
+
+    rows = []
+    recent = []
+    for phrase_id, phrase in enumerate(phrases):
+        if phrase["attention"] is None:
+            continue
+        baseline = sum(recent) / len(recent) if recent else phrase["attention"]
+        rows.append(dict(phrase,
+                         id=phrase_id,
+                         attention=round(phrase["attention"]),
+                         baseline=round(baseline),
+                         drop=round(baseline - phrase["attention"], 1),
+                         timestamp=format_timestamp(phrase["start"])))
+        recent = (recent + [phrase["attention"]])[-baseline_phrases:]
+
+    rows.sort(key=lambda row: row["drop"], reverse=True)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the phrases where class attention dropped most.")
+    parser.add_argument("csv_path", help="attention CSV (Timestamp, Name, State)")
+    parser.add_argument("transcription_file", help="word transcription CSV (Word, Start Time, End Time)")
+    parser.add_argument("--top", type=int, default=10, help="number of phrases to show")
+    args = parser.parse_args()
+
+    report = attention_drop_report(load_word_subtitles(args.transcription_file),
+                                   AttentionStore.from_csv(args.csv_path))
+    for row in report[:args.top]:
+        print(f"[{row['timestamp']}] -{row['drop']:5.1f} pts ({row['baseline']}% -> {row['attention']}%)  {row['text']}")
@@ -0,0 +1,53 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QUrl
+from PyQt5.QtGui import QImage, QTextDocument
+
+RESOURCE_DIR = os.path.dirname(os.path.abspath(__file__))  # Icons are looked up next to the code
+
+
+class SharedResources:
+    """Frame decoding threads and icons shared by every player window in the process.
+
+    OpenCV releases the GIL while decoding and resizing, so windows that submit their frames to one
+    pool decode in parallel without each owning threads. Icons are read from disk once and
+    registered with each text pane's document instead of being reloaded per alert.
+    """
+
+    def __init__(self, decoder_threads=None):
+        self.decoder_threads = decoder_threads or min(4, os.cpu_count() or 1)
+        self.decoder_pool = ThreadPoolExecutor(max_workers=self.decoder_threads, thread_name_prefix="frame-decode")
+        self._icons = {}
+
+    def icon(self, name):
+        """QImage for icon `name` (a path, relative ones resolved against the code directory)."""
+        image = self._icons.get(name)
+        if image is None:
+            path = name if os.path.isabs(name) or os.path.exists(name) else os.path.join(RESOURCE_DIR, name)
+            image = QImage(path)
+            if image.isNull():
+                print(f"Warning: Could not load icon {name}")
+            self._icons[name] = image
+        return image
+
+    def add_icon(self, document, name):
+        """Make icon `name` available to `document` under its own name (see QTextImageFormat.setName)."""
+        document.addResource(QTextDocument.ImageResource, QUrl(name), self.icon(name))
+
+    def icon_count(self):
+        return len(self._icons)
+
+    def shutdown(self):
+        self.decoder_pool.shutdown(wait=True)
+
+
+_shared = None
+
+
+def shared_resources():
+    """The process-wide SharedResources, created on first use."""
+    global _shared
+    if _shared is None:
+        _shared = SharedResources()
+    return _shared
@@ -0,0 +1,192 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+# VideoPlayer methods timed by default: the frame tick, the subtitles it draws, the alert timer's slot
+# and the alert pane renders. VideoPlayer instruments itself before connecting any of them to a signal.
+PLAYER_SLOTS = ("update_frame", "display_words", "fire_alerts", "display_text_for_selected_interval",
+                "display_text_for_selected_interval_cumulative")
+HEARTBEAT_MS = 20  # The GUI thread checks in this often...
+STALL_MS = 100  # ...and a gap longer than this is an event-loop stall
+SAMPLE_MS = 5  # Stack sampling period during a stall
+LATE_FRACTION = 0.5  # A timer tick later than this fraction of its interval counts as late
+
+_EVENT_NAMES = {int(value): name for name, value in vars(QEvent).items() if isinstance(value, QEvent.Type)}
+
+
+def _percentile(values, percentile):
+    return float(np.percentile(values, percentile)) if len(values) else 0.0
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class QtProfiler(QObject):
+    """Opt-in profiler for the Qt event loop.
+
+    - An application event filter counts events by type and remembers which one is being
+      delivered, and measures how late every repeating QTimer fires compared with its interval
+      (ticks more than a whole interval late mean missed ticks).
+    - instrument() wraps methods such as VideoPlayer.update_frame to time each call.
+    - A heartbeat timer on the GUI thread and a watchdog thread detect stalls: while the heartbeat
+      is overdue, the watchdog samples the GUI thread's Python stack. write_folded() exports the
+      samples as folded stacks ("frame;frame;frame count"), which flamegraph.pl, speedscope and
+      inferno load directly.
+    """
+
+    def __init__(self, stall_ms=STALL_MS, sample_ms=SAMPLE_MS, parent=None):
+        super().__init__(parent)
+        self.stall_ms = stall_ms
+        self.sample_ms = sample_ms
+        self.event_counts = Counter()
+        self.slot_times = {}  # Slot name -> call durations (ms)
+        self.timer_ticks = {}  # Timer name -> [interval ms, lateness of each tick (ms), missed ticks]
+        self._last_ticks = {}  # id(QTimer) -> (interval ms, last tick)
+        self.stalls = []  # (start offset s, duration ms, event being delivered)
+        self.stacks = Counter()  # Folded stack -> samples
+        self.current_event = None
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._started = self._last_beat
+        self._running = False
+        self._watchdog = None
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setObjectName("profiler-heartbeat")
+        self._heartbeat.timeout.connect(self._beat)
+
+    def install(self, app):
+        """Start profiling `app` (call on the GUI thread)."""
+        self._gui_thread = threading.get_ident()
+        self._started = self._last_beat = time.perf_counter()
+        app.installEventFilter(self)
+        self._heartbeat.start(HEARTBEAT_MS)
+        self._running = True
+        self._watchdog = threading.Thread(target=self._watch, name="qt-profiler-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self, app=None):
+        self._running = False
+        self._heartbeat.stop()
+        if app is not None:
+            app.removeEventFilter(self)
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def instrument(self, owner, names=PLAYER_SLOTS, prefix=None):
+        """Time every call of the methods `names` of `owner`.
+
+        Only the instance attributes are replaced, so signals connected to the bound methods before
+        this call keep calling the untimed ones: instrument first, then connect.
+        """
+        prefix = prefix or type(owner).__name__
+        for name in names:
+            method = getattr(owner, name, None)
+            if method is not None:
+                setattr(owner, name, self._timed(f"{prefix}.{name}", method))
+
+    def _timed(self, label, method):
+        durations = self.slot_times.setdefault(label, [])
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                durations.append((time.perf_counter() - started) * 1000)
+        return timed
+
+    def eventFilter(self, obj, event):
+        event_type = int(event.type())
+        self.event_counts[event_type] += 1
+        self.current_event = event_type
+        if event_type == QEvent.Timer and isinstance(obj, QTimer) and not obj.isSingleShot():
+            self._timer_tick(obj)
+        return False
+
+    def _timer_tick(self, timer):
+        now = time.perf_counter()
+        interval = timer.interval()
+        last = self._last_ticks.get(id(timer))
+        self._last_ticks[id(timer)] = (interval, now)
+        if last is None or last[0] != interval:
+            return  # First tick, or the timer was restarted with another interval
+        window = timer.parent().windowTitle() if timer.parent() is not None and timer.parent().isWidgetType() else ""
+        name = f"{window}: {timer.objectName() or 'QTimer'}" if window else timer.objectName() or "QTimer"
+        ticks = self.timer_ticks.setdefault(name, [interval, [], 0])
+        late_ms = (now - last[1]) * 1000 - interval
+        ticks[0] = interval
+        ticks[1].append(late_ms)
+        if interval > 0 and late_ms >= interval:
+            ticks[2] += int(late_ms // interval)
+
+    def _beat(self):
+        self._last_beat = time.perf_counter()
+
+    def _watch(self):
+        """Watchdog thread: sample the GUI thread's stack while its heartbeat is overdue."""
+        stall_start = stall_event = None
+        while self._running:
+            time.sleep(self.sample_ms / 1000)
+            now = time.perf_counter()
+            overdue = (now - self._last_beat) * 1000 > max(self.stall_ms, HEARTBEAT_MS * 2)
+            if overdue:
+                if stall_start is None:
+                    stall_start = self._last_beat
+                    stall_event = self.current_event
+                frame = sys._current_frames().get(self._gui_thread)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                root = f"event:{_EVENT_NAMES.get(stall_event, stall_event)}"
+                self.stacks[";".join([root] + stack[::-1])] += 1
+            elif stall_start is not None:
+                self.stalls.append((stall_start - self._started, (self._last_beat - stall_start) * 1000,
+                                    _EVENT_NAMES.get(stall_event, stall_event)))
+                stall_start = stall_event = None
+
+    def write_folded(self, path):
+        """Write the sampled stall stacks in folded format; returns the number of samples."""
+        with open(path, 'w', encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return sum(self.stacks.values())
+
+    def report(self):
+        """Summary of stalls, timer lateness, slot times and busiest event types, as text."""
+        lines = []
+        stall_ms = [duration for _, duration, _ in self.stalls]
+        lines.append(f"Event-loop stalls (> {self.stall_ms} ms): {len(stall_ms)}, "
+                     f"total {sum(stall_ms):.0f} ms, longest {max(stall_ms, default=0):.0f} ms")
+        for start, duration, event_name in sorted(self.stalls, key=lambda stall: -stall[1])[:5]:
+            lines.append(f"  at {start:8.2f} s  {duration:7.0f} ms  during {event_name}")
+
+        lines.append("Timers:")
+        for name, (interval, lateness, missed) in sorted(self.timer_ticks.items()):
+            late = sum(1 for value in lateness if value > interval * LATE_FRACTION)
+            lines.append(f"  {name:<40} every {interval:>4} ms  ticks {len(lateness):>7}  late {late:>6}  "
+                         f"missed {missed:>6}  lateness p50 {_percentile(lateness, 50):6.1f} ms  "
+                         f"p99 {_percentile(lateness, 99):6.1f} ms")
+
+        lines.append("Slots:")
+        for name, durations in sorted(self.slot_times.items(), key=lambda item: -sum(item[1])):
+            if durations:
+                lines.append(f"  {name:<58} calls {len(durations):>7}  total {sum(durations):9.0f} ms  "
+                             f"p50 {_percentile(durations, 50):7.2f} ms  p99 {_percentile(durations, 99):7.2f} ms  "
+                             f"max {max(durations):7.1f} ms")
+
+        top_events = ", ".join(f"{_EVENT_NAMES.get(event_type, event_type)} {count}"
+                               for event_type, count in self.event_counts.most_common(8))
+        lines.append(f"Events: {top_events}")
+        return "\n".join(lines)
@@ -0,0 +1,279 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+
+import backends
+from alert_timeline import AlertTimeline, INTERVAL_PANE, CUMULATIVE_PANE
+from attention_metrics import group_attentiveness_by_interval, calculate_student_intervals, build_display_data, \
+    calculate_cumulative_data, cumulative_phrase
+from attention_store import AttentionStore
+from scoring_policy import DEFAULT_POLICY, load_policy
+from transcript import load_word_subtitles, WordColumns
+
+PANEL_WIDTH = 440  # Alert column to the right of the video
+STRIP_HEIGHT = 120  # Subtitle cell under the video
+TEXT_COLOR = (20, 20, 20)
+ALERT_COLORS = {"red": (60, 31, 210), "yellow": (0, 133, 242), "green": (80, 175, 76)}  # Tag -> BGR
+
+
+def _bgr(color):
+    return tuple(int(color[i:i + 2], 16) for i in (5, 3, 1))
+
+
+def _wrap(cv2, text, width, scale, thickness=1):
+    """Split `text` into lines no wider than `width` pixels in the Hershey font."""
+    lines = []
+    for word in text.split():
+        candidate = f"{lines[-1]} {word}" if lines else word
+        if lines and cv2.getTextSize(candidate, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)[0][0] <= width:
+            lines[-1] = candidate
+        else:
+            lines.append(word)
+    return lines
+
+
+def _draw_lines(cv2, image, lines, x, y, scale, color, thickness=1, line_height=None, max_y=None):
+    line_height = line_height or int(34 * scale)
+    for line in lines:
+        if max_y is not None and y > max_y:
+            break
+        cv2.putText(image, line, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness, cv2.LINE_AA)
+        y += line_height
+    return y
+
+
+class SessionOverlay:
+    """Subtitle strip and alert panel for every moment of a session, rendered once per change.
+
+    The subtitle cell changes when a word starts and the alerts when an interval ends (see
+    AlertTimeline), so panels are cached by their content and frames only copy them in.
+    """
+
+    def __init__(self, word_columns, display_data, cumulative_streak_data, attention_data, policy=DEFAULT_POLICY):
+        self.cv2 = backends.cv2()
+        self.word_columns = word_columns
+        self.display_data = dict(display_data)
+        self.cumulative = {row[0]: row for row in cumulative_streak_data}
+        self.attention_data = attention_data
+        self.policy = policy
+        self.alert_timeline = AlertTimeline(display_data, cumulative_streak_data)
+        self.alert_labels = {INTERVAL_PANE: None, CUMULATIVE_PANE: None}
+        self._strip_key = self._panel_key = None
+        self.strip = self.panel = None
+
+    def panels(self, current_time, width, height):
+        """(strip, panel) images for `current_time` in a `width` wide frame whose video is `height` tall.
+
+        Call with increasing times; the images are replaced, never modified, when they change.
+        """
+        for _, interval_label, panes in self.alert_timeline.advance(current_time):
+            for pane in panes:
+                self.alert_labels[pane] = interval_label
+        panel_key = (self.alert_labels[INTERVAL_PANE], self.alert_labels[CUMULATIVE_PANE], height)
+        if panel_key != self._panel_key:
+            self.panel = self.render_panel(height)
+            self._panel_key = panel_key
+
+        cell_index = int(current_time // 10)
+        words = self.word_columns.window(cell_index * 10, min(current_time, cell_index * 10 + 10) + 1e-9)
+        strip_key = (cell_index, len(words), width)
+        if strip_key != self._strip_key:
+            self.strip = self.render_strip(cell_index, words, width)
+            self._strip_key = strip_key
+        return self.strip, self.panel
+
+    def render_strip(self, cell_index, words, width):
+        """Subtitle cell like the player's list: spoken words on the cell's attention color."""
+        cv2 = self.cv2
+        counts = self.attention_data.state_counts(cell_index * 10, cell_index * 10 + 10)
+        strip = np.empty((STRIP_HEIGHT, width, 3), dtype=np.uint8)
+        strip[:] = _bgr(self.policy.color(self.policy.percentage(counts)))
+        lines = _wrap(cv2, " ".join(word["word"] for word in words), width - 40, 0.9, 2)
+        _draw_lines(cv2, strip, lines[-3:], 20, 40, 0.9, TEXT_COLOR, 2)  # The latest words stay visible
+        return strip
+
+    def render_panel(self, height):
+        """Alert column: the class summary on top, then the students flagged in the last interval."""
+        cv2 = self.cv2
+        panel = np.empty((height, PANEL_WIDTH, 3), dtype=np.uint8)
+        panel[:] = (235, 235, 235)
+        y = 30
+        cumulative_label = self.alert_labels[CUMULATIVE_PANE]
+        if cumulative_label is not None:
+            _, percentage, state, streak = self.cumulative[cumulative_label]
+            phrase, tag = cumulative_phrase(percentage, state, streak)
+            y = _draw_lines(cv2, panel, [cumulative_label], 16, y, 0.6, TEXT_COLOR, 1)
+            y = _draw_lines(cv2, panel, _wrap(cv2, phrase, PANEL_WIDTH - 32, 0.6, 2), 16, y, 0.6,
+                            ALERT_COLORS.get(tag, TEXT_COLOR), 2) + 12
+        interval_label = self.alert_labels[INTERVAL_PANE]
+        if interval_label is not None:
+            for phrase, tag in self.display_data.get(interval_label, []):
+                if tag not in ("red", "yellow"):  # The player's alert pane only lists these too
+                    continue
+                y = _draw_lines(cv2, panel, _wrap(cv2, phrase.strip(), PANEL_WIDTH - 32, 0.55), 16, y, 0.55,
+                                ALERT_COLORS[tag], 1, max_y=height - 10) + 8
+                if y > height - 10:
+                    break
+        return panel
+
+
+def _composite(cv2, frame, canvas, yuv, video_size, strip, panel):
+    """Draw one output frame into `canvas` (BGR): video, alert panel on its right, subtitles below.
+
+    The frame is converted to the encoder's YUV 4:2:0 here, on the worker, so the encoder does
+    not have to convert it on the encoding thread. Returns `yuv`.
+    """
+    video_width, video_height = video_size
+    cv2.resize(frame, video_size, dst=canvas[:video_height, :video_width], interpolation=cv2.INTER_AREA)
+    canvas[:video_height, video_width:] = panel
+    canvas[video_height:] = strip
+    cv2.cvtColor(canvas, cv2.COLOR_BGR2YUV_I420, dst=yuv)
+    return yuv
+
+
+def render_session(video_path, out_path, overlay, video_width=840, workers=None, audio_path=None,
+                   start_time=0.0, end_time=None, crf=23, preset="veryfast"):
+    """Render the annotated playback of a session to an MP4 without showing a window.
+
+    Frames are decoded in order, composited on a thread pool (OpenCV releases the GIL while
+    resizing) and encoded with H.264 in order; the audio track is copied from `audio_path`, or
+    from the video itself, without re-encoding. Returns (frames written, media seconds, seconds taken).
+    """
+    cv2 = backends.cv2()
+    av = backends.av()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    source_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    source_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    video_size = (video_width // 2 * 2, int(video_width * source_height / source_width) // 2 * 2)  # Even for yuv420p
+    canvas_width, canvas_height = video_size[0] + PANEL_WIDTH, video_size[1] + STRIP_HEIGHT
+
+    first_frame = int(start_time * fps)
+    last_frame = int(end_time * fps) if end_time is not None else int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1 << 31
+    if first_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+    workers = workers or min(8, os.cpu_count() or 1)
+    in_flight = workers * 2
+    # Decode buffers and canvases rotate; a slot is reused only after its frame was encoded
+    slots = in_flight + 1
+    decoded = [np.empty((source_height, source_width, 3), dtype=np.uint8) for _ in range(slots)]
+    canvases = [np.empty((canvas_height, canvas_width, 3), dtype=np.uint8) for _ in range(slots)]
+    yuv_frames = [np.empty((canvas_height * 3 // 2, canvas_width), dtype=np.uint8) for _ in range(slots)]
+
+    rate = Fraction(fps).limit_denominator(1001)
+    audio_source = audio_packets = None
+    started = time.perf_counter()
+    written = 0
+    with av.open(out_path, "w") as output, ThreadPoolExecutor(workers, thread_name_prefix="render") as pool:
+        video_stream = output.add_stream("libx264", rate=rate)
+        video_stream.width, video_stream.height = canvas_width, canvas_height
+        video_stream.pix_fmt = "yuv420p"
+        video_stream.options = {"crf": str(crf), "preset": preset}
+
+        audio_source = av.open(audio_path or video_path)
+        source_audio = next((stream for stream in audio_source.streams if stream.type == "audio"), None)
+        if source_audio is not None:
+            audio_stream = output.add_stream_from_template(source_audio)
+            if start_time:
+                audio_source.seek(int(start_time / source_audio.time_base), stream=source_audio)
+            audio_packets = audio_source.demux(source_audio)
+        pending_audio = None
+
+        def mux_audio(until):
+            """Copy audio packets up to media time `until`, interleaved with the video."""
+            nonlocal pending_audio, audio_packets
+            while audio_packets is not None:
+                packet = pending_audio or next(audio_packets, None)
+                pending_audio = None
+                if packet is None:
+                    audio_packets = None
+                    return
+                if packet.pts is None or packet.dts is None:
+                    continue  # Demuxer flush packets
+                packet_time = packet.pts * packet.time_base
+                if packet_time < start_time:
+                    continue
+                if packet_time > until or (end_time is not None and packet_time >= end_time):
+                    pending_audio = packet
+                    return
+                shift = round(Fraction(start_time) / packet.time_base)
+                packet.pts -= shift
+                packet.dts -= shift
+                packet.stream = audio_stream
+                output.mux(packet)
+
+        def encode(job):
+            frame_index, future = job
+            image = av.VideoFrame.from_ndarray(future.result(), format="yuv420p")
+            image.pts = frame_index - first_frame
+            image.time_base = 1 / rate
+            mux_audio((frame_index + 1) / fps)
+            output.mux(video_stream.encode(image))
+
+        jobs = deque()
+        for frame_index in range(first_frame, last_frame):
+            slot = frame_index % slots
+            ret, frame = cap.read(decoded[slot])
+            if not ret:
+                break
+            strip, panel = overlay.panels(frame_index / fps, canvas_width, video_size[1])
+            jobs.append((frame_index, pool.submit(_composite, cv2, frame, canvases[slot], yuv_frames[slot], video_size,
+                                                  strip, panel)))
+            while len(jobs) >= in_flight:
+                encode(jobs.popleft())
+                written += 1
+        while jobs:
+            encode(jobs.popleft())
+            written += 1
+        output.mux(video_stream.encode(None))
+        mux_audio(float("inf"))
+        audio_source.close()
+    cap.release()
+    return written, written / fps, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a session's annotated playback to an MP4, without a window.")
+    parser.add_argument("video_path", help="session video")
+    parser.add_argument("out_path", help="MP4 to write")
+    parser.add_argument("--csv", help="attention CSV (Timestamp, Name, State)")
+    parser.add_argument("--transcription", help="word transcription CSV (Word, Start Time, End Time)")
+    parser.add_argument("--archive", help="session archive to read instead of the CSVs")
+    parser.add_argument("--audio", help="separate audio file (defaults to the video's own track)")
+    parser.add_argument("--policy", help="JSON scoring policy (see scoring_policy)")
+    parser.add_argument("--width", type=int, default=840, help="width of the video inside the output")
+    parser.add_argument("--workers", type=int, help="compositing threads (default: CPU count, at most 8)")
+    parser.add_argument("--start", type=float, default=0.0, help="first second to render")
+    parser.add_argument("--end", type=float, help="last second to render")
+    parser.add_argument("--crf", type=int, default=23, help="H.264 quality (lower is better and bigger)")
+    parser.add_argument("--preset", default="veryfast", help="x264 speed preset, e.g. ultrafast, veryfast, medium")
+    args = parser.parse_args()
+
+    policy = load_policy(args.policy) if args.policy else DEFAULT_POLICY
+    if args.archive:
+        from session_archive import load_session_archive
+        archive = load_session_archive(args.archive)
+        attention_data, word_columns = archive.attention_data, archive.word_columns
+    elif args.csv:
+        attention_data = AttentionStore.from_csv(args.csv)
+        word_columns = WordColumns.from_word_subtitles(load_word_subtitles(args.transcription) if args.transcription
+                                                       else [])
+    else:
+        parser.error("give --archive or --csv")
+
+    # Metrics are recomputed so the policy applies; the store's counts make this cheap
+    grouped_data = group_attentiveness_by_interval(attention_data, 60, policy)
+    display_data = build_display_data(calculate_student_intervals(grouped_data, policy=policy))
+    overlay = SessionOverlay(word_columns, display_data, calculate_cumulative_data(grouped_data, policy),
+                             attention_data, policy)
+    frames, media_seconds, seconds = render_session(args.video_path, args.out_path, overlay, args.width, args.workers,
+                                                    args.audio, args.start, args.end, args.crf, args.preset)
+    print(f"Rendered {frames} frames ({media_seconds:.1f} s of video) in {seconds:.1f} s "
+          f"({media_seconds / max(seconds, 1e-9):.1f}x real time) to {args.out_path}")
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+
+from attention_store import AttentionState
+
+# Upper bound (inclusive) of each band's attentive percentage, with its state and tag; the last
+# band has no bound
+DEFAULT_BANDS = (
+    (50, "Inattentive", "red"),
+    (70, "Inconsistent", "yellow"),
+    (None, "Attentive", "green"),
+)
+
+# (minimum attentive percentage, color) for subtitle cells and the heatmap, highest band first
+ATTENTION_COLORS = (
+    (70, '#4CAF50'),  # High attentiveness
+    (50, '#FFB300'),  # Moderate attentiveness
+    (0, '#F44336'),  # Low attentiveness
+)
+
+# How much one sample in each state counts towards "attentive" ("Confused" counts fully by default)
+DEFAULT_WEIGHTS = {
+    AttentionState.ATTENTIVE: 1.0,
+    AttentionState.CONFUSED: 1.0,
+    AttentionState.NOT_ATTENTIVE: 0.0,
+    AttentionState.UNKNOWN: 0.0,
+}
+
+
+class ScoringPolicy:
+    """How attention samples become an attentive percentage, a state and a color.
+
+    Each state has a weight (the share of a sample that counts as attentive), so a percentage is
+    the weighted sum of per-state counts over their total. Percentages are then classified with
+    `bands` (interval and class alerts) and colored with `colors` (subtitle cells, heatmap).
+    Policies only see per-state counts, so switching policy reuses the counts the store cached.
+    """
+
+    def __init__(self, weights=None, bands=DEFAULT_BANDS, colors=ATTENTION_COLORS, name="Custom"):
+        merged = dict(DEFAULT_WEIGHTS)
+        for state, weight in (weights or {}).items():
+            state = AttentionState.from_label(state) if isinstance(state, str) else AttentionState(state)
+            merged[state] = float(weight)
+        self.weights = np.array([merged[state] for state in AttentionState], dtype=np.float64)
+        self.bands = tuple((None if upper is None else float(upper), state, tag) for upper, state, tag in bands)
+        self.colors = tuple(sorted(((float(minimum), color) for minimum, color in colors), reverse=True))
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, config, name=None):
+        """Policy from a dict such as {"weights": {"Confused": 0.5}, "bands": [[50, "Inattentive", "red"], ...]}."""
+        return cls(weights=config.get("weights"),
+                   bands=config.get("bands", DEFAULT_BANDS),
+                   colors=config.get("colors", ATTENTION_COLORS),
+                   name=name or config.get("name", "Custom"))
+
+    def key(self):
+        return tuple(self.weights.tolist()), self.bands, self.colors
+
+    def __eq__(self, other):
+        return isinstance(other, ScoringPolicy) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def weighted_counts(self, state_counts):
+        """Attentive sample counts from per-state counts (last axis indexed by AttentionState)."""
+        return np.asarray(state_counts) @ self.weights
+
+    def percentage(self, state_counts):
+        """Attentive percentage from per-state counts (0 where there are no samples)."""
+        state_counts = np.asarray(state_counts)
+        total = state_counts.sum(axis=-1)
+        weighted = self.weighted_counts(state_counts) * 100
+        if np.ndim(total) == 0:
+            return weighted / total if total else 0
+        return np.divide(weighted, total, out=np.zeros(np.shape(total)), where=total > 0)
+
+    def classify(self, percentage):
+        """(state, tag) of the band `percentage` falls in."""
+        for upper, state, tag in self.bands:
+            if upper is None or percentage <= upper:
+                return state, tag
+        return self.bands[-1][1:]
+
+    def color(self, percentage):
+        for minimum, color in self.colors:
+            if percentage >= minimum:
+                return color
+        return self.colors[-1][1]
+
+
+DEFAULT_POLICY = ScoringPolicy(name="Confused counts as attentive")
+
+PRESET_POLICIES = (
+    DEFAULT_POLICY,
+    ScoringPolicy({AttentionState.CONFUSED: 0.5}, name="Confused counts half"),
+    ScoringPolicy({AttentionState.CONFUSED: 0.0}, name="Confused counts as inattentive"),
+    ScoringPolicy(bands=((60, "Inattentive", "red"), (80, "Inconsistent", "yellow"), (None, "Attentive", "green")),
+                  colors=((80, '#4CAF50'), (60, '#FFB300'), (0, '#F44336')), name="Strict bands (60/80)"),
+)
+
+
+def load_policy(path):
+    """Read a scoring policy from a JSON file (see ScoringPolicy.from_dict)."""
+    with open(path, 'r', encoding="utf-8") as f:
+        return ScoringPolicy.from_dict(json.load(f), name=None)
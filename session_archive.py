@@ -0,0 +1,224 @@
+import argparse
+import os
+
+import numpy as np
+
+from attention_metrics import group_attentiveness_by_interval, calculate_student_intervals, build_display_data, \
+    calculate_cumulative_data
+from attention_quality import normalize_attention, UNKNOWN_POLICIES
+from attention_store import AttentionState, AttentionStore, StudentRegistry
+import backends
+from transcript import load_word_subtitles, TranscriptIndex, WordColumns, INDEX_SUFFIX
+
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def session_partition(out_dir, session_name, date=None):
+    """Directory for one session, laid out as hive-style partitions (date=.../session=...)."""
+    parts = [out_dir]
+    if date:
+        parts.append(f"date={date}")
+    parts.append(f"session={session_name}")
+    return os.path.join(*parts)
+
+
+def attention_table(attention_data):
+    """Attention samples as an Arrow table; student and state stay dictionary-encoded."""
+    pa = backends.pyarrow()
+    students = pa.DictionaryArray.from_arrays(
+        pa.array(attention_data.student_ids.view(np.int16)),
+        pa.array(attention_data.registry.names, type=pa.string()))
+    states = pa.DictionaryArray.from_arrays(
+        pa.array(attention_data.states.view(np.int8)),
+        pa.array([state.label for state in AttentionState], type=pa.string()))
+    columns = {
+        "timestamp": pa.array(attention_data.timestamps),
+        "student": students,
+        "state": states,
+    }
+    if attention_data.filled is not None:  # Normalized sessions flag gap-filled samples
+        columns["filled"] = pa.array(attention_data.filled)
+    return pa.table(columns)
+
+
+def words_table(word_subtitles):
+    pa = backends.pyarrow()
+    return pa.table({
+        "start": pa.array([word["start"] for word in word_subtitles], type=pa.float64()),
+        "end": pa.array([word["end"] for word in word_subtitles], type=pa.float64()),
+        "word": pa.array([word["word"] for word in word_subtitles], type=pa.string()),
+    })
+
+
+def intervals_table(student_rows):
+    pa = backends.pyarrow()
+    return pa.Table.from_pylist(student_rows, schema=pa.schema([
+        ("interval", pa.string()),
+        ("student", pa.string()),
+        ("attentive_count", pa.int64()),
+        ("total_count", pa.int64()),
+        ("attentiveness_percentage", pa.float64()),
+        ("state", pa.string()),
+        ("tag", pa.string()),
+        ("streak", pa.int64()),
+        ("phrase", pa.string()),
+    ]))
+
+
+def cumulative_table(cumulative_streak_data):
+    pa = backends.pyarrow()
+    intervals, percentages, states, streaks = zip(*cumulative_streak_data) if cumulative_streak_data else ([],) * 4
+    return pa.table({
+        "interval": pa.array(intervals, type=pa.string()),
+        "attentiveness_percentage": pa.array(percentages, type=pa.float64()),
+        "state": pa.array(states, type=pa.string()),
+        "streak": pa.array(streaks, type=pa.int64()),
+    })
+
+
+def _write_table(table, path, file_format):
+    pa = backends.pyarrow()
+    if file_format == "parquet":
+        pa.parquet.write_table(table, path)
+    else:
+        # Uncompressed IPC files can be memory-mapped and read without copying
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def export_session(out_dir, session_name, csv_path, transcription_file, date=None, file_format="arrow",
+                   normalize=None):
+    """Export one session's samples, words and computed metrics as columnar files.
+
+    With `normalize` ("drop", "reassign" or "keep" for unknown participants) the samples are
+    normalized first (see attention_quality.normalize_attention). Returns the session's
+    partition directory.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown archive format {file_format!r} (expected one of {', '.join(FORMATS)})")
+
+    attention_data = AttentionStore.from_csv(csv_path)
+    if normalize:
+        attention_data, _ = normalize_attention(attention_data, normalize)
+    word_subtitles = load_word_subtitles(transcription_file)
+    grouped_data = group_attentiveness_by_interval(attention_data, interval=60)
+
+    tables = {
+        "attention": attention_table(attention_data),
+        "words": words_table(word_subtitles),
+        "intervals": intervals_table(calculate_student_intervals(grouped_data)),
+        "cumulative": cumulative_table(calculate_cumulative_data(grouped_data)),
+    }
+
+    session_dir = session_partition(out_dir, session_name, date)
+    os.makedirs(session_dir, exist_ok=True)
+    for name, table in tables.items():
+        _write_table(table, os.path.join(session_dir, name + FORMATS[file_format]), file_format)
+    TranscriptIndex.build(word_subtitles).save(os.path.join(session_dir, "transcript" + INDEX_SUFFIX))
+    return session_dir
+
+
+def _read_table(session_dir, name):
+    pa = backends.pyarrow()
+    arrow_path = os.path.join(session_dir, name + FORMATS["arrow"])
+    if os.path.exists(arrow_path):
+        return pa.ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+    parquet_path = os.path.join(session_dir, name + FORMATS["parquet"])
+    if os.path.exists(parquet_path):
+        return pa.parquet.read_table(parquet_path, memory_map=True)
+    raise FileNotFoundError(f"No {name} table in session archive {session_dir}")
+
+
+def _column_array(table, name):
+    column = table.column(name)
+    return column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+
+
+class SessionArchive:
+    """A session loaded from its columnar archive, in the shapes VideoPlayer uses."""
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        self.attention_data = self._load_attention()
+
+        # Word columns stay memory-mapped; word dicts are only built when word_subtitles is used
+        words = _read_table(session_dir, "words")
+        self.word_columns = WordColumns(_column_array(words, "start").to_numpy(zero_copy_only=False),
+                                        _column_array(words, "end").to_numpy(zero_copy_only=False),
+                                        _column_array(words, "word"))
+        self._word_subtitles = None
+
+        index_path = os.path.join(session_dir, "transcript" + INDEX_SUFFIX)
+        if os.path.exists(index_path):
+            self.transcript_index = TranscriptIndex.load(index_path)
+        else:
+            self.transcript_index = TranscriptIndex.build(self.word_subtitles)
+
+        self.student_rows = _read_table(session_dir, "intervals").to_pylist()
+        self.display_data = build_display_data(self.student_rows)
+
+        cumulative = _read_table(session_dir, "cumulative")
+        self.cumulative_streak_data = list(zip(*(cumulative.column(name).to_pylist() for name in
+                                                 ("interval", "attentiveness_percentage", "state", "streak"))))
+
+    @property
+    def word_subtitles(self):
+        if self._word_subtitles is None:
+            self._word_subtitles = list(self.word_columns)
+        return self._word_subtitles
+
+    def _load_attention(self):
+        table = _read_table(self.session_dir, "attention")
+        students = _column_array(table, "student")
+        states = _column_array(table, "state")
+
+        # Arrow archives keep the registry order as the dictionary, so the index buffer is used
+        # as-is; Parquet may rebuild dictionaries on read, in which case the ids are remapped
+        names = students.dictionary.to_pylist()
+        registry = StudentRegistry(names)
+        student_ids = students.indices.to_numpy(zero_copy_only=False)
+        if registry.names == names:
+            student_ids = student_ids.view(np.uint16)
+        else:
+            student_ids = np.array([registry.id_of(name) for name in names], dtype=np.uint16)[student_ids]
+
+        state_codes = np.array([AttentionState.from_label(label) for label in states.dictionary.to_pylist()],
+                               dtype=np.uint8)
+        filled = None
+        if "filled" in table.column_names:
+            filled = _column_array(table, "filled").to_numpy(zero_copy_only=False)
+        return AttentionStore(_column_array(table, "timestamp").to_numpy(zero_copy_only=False),
+                              student_ids,
+                              state_codes[states.indices.to_numpy(zero_copy_only=False)],
+                              registry,
+                              presorted=True,
+                              filled=filled)
+
+
+def load_session_archive(session_dir):
+    """Open a session directory written by export_session."""
+    return SessionArchive(session_dir)
+
+
+def is_session_archive(path):
+    """True if `path` is a directory containing an exported attention table."""
+    return os.path.isdir(path) and any(
+        os.path.exists(os.path.join(path, "attention" + ext)) for ext in FORMATS.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a session's CSVs to a columnar archive.")
+    parser.add_argument("csv_path", help="attention CSV (Timestamp, Name, State)")
+    parser.add_argument("transcription_file", help="word transcription CSV (Word, Start Time, End Time)")
+    parser.add_argument("out_dir", help="root directory of the archive")
+    parser.add_argument("--session", help="session name (defaults to the attention CSV's file name)")
+    parser.add_argument("--date", help="optional date partition, e.g. 2025-01-09")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="arrow")
+    parser.add_argument("--normalize", choices=UNKNOWN_POLICIES,
+                        help="dedup and resample the samples to 1 Hz first, handling unknown participants this way")
+    args = parser.parse_args()
+
+    session_name = args.session or os.path.splitext(os.path.basename(args.csv_path))[0]
+    print(export_session(args.out_dir, session_name, args.csv_path, args.transcription_file,
+                         date=args.date, file_format=args.format, normalize=args.normalize))
@@ -0,0 +1,241 @@
+import argparse
+import csv
+import datetime
+import os
+import sqlite3
+import time
+
+from attention_metrics import group_attentiveness_by_interval, calculate_student_intervals, parse_interval_label
+from attention_store import AttentionStore
+
+ATTENTION_HEADER = {"Timestamp", "Name", "State"}
+TRANSCRIPTION_HEADER = {"Word", "Start Time", "End Time"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    csv_path TEXT NOT NULL,
+    transcription_file TEXT,
+    started_on TEXT NOT NULL,          -- ISO date, used for "this month" style filters
+    duration_minutes INTEGER NOT NULL,
+    csv_mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started_on ON sessions (started_on);
+
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS minute_aggregates (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    student_id INTEGER NOT NULL REFERENCES students (id),
+    minute INTEGER NOT NULL,
+    attentive_count INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    percentage REAL NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (session_id, student_id, minute)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS minute_aggregates_student_state
+    ON minute_aggregates (student_id, state, session_id, minute);
+
+CREATE VIEW IF NOT EXISTS class_minutes AS
+    SELECT session_id, minute,
+           SUM(attentive_count) AS attentive_count,
+           SUM(total_count) AS total_count,
+           100.0 * SUM(attentive_count) / SUM(total_count) AS percentage
+    FROM minute_aggregates
+    GROUP BY session_id, minute;
+"""
+
+
+def _csv_header(path):
+    with open(path, 'r', encoding="utf-8") as f:
+        return {field.strip() for field in next(csv.reader(f), [])}
+
+
+def csv_kind(path):
+    """"attention" or "transcription" depending on the CSV's header, else None."""
+    header = _csv_header(path)
+    if ATTENTION_HEADER <= header:
+        return "attention"
+    if TRANSCRIPTION_HEADER <= header:
+        return "transcription"
+    return None
+
+
+def discover_session_files(directory):
+    """Find the attention CSV and transcription CSV in a session directory by their headers.
+
+    Returns (csv_path, transcription_file); either is None if not found.
+    """
+    csv_path = transcription_file = None
+    for entry in sorted(os.listdir(directory)):
+        path = os.path.join(directory, entry)
+        if not entry.lower().endswith(".csv") or not os.path.isfile(path):
+            continue
+        kind = csv_kind(path)
+        if csv_path is None and kind == "attention":
+            csv_path = path
+        elif transcription_file is None and kind == "transcription":
+            transcription_file = path
+    return csv_path, transcription_file
+
+
+class SessionCatalog:
+    """On-disk SQLite index of sessions, students and per-minute attention aggregates."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _student_ids(self, names):
+        self.conn.executemany("INSERT OR IGNORE INTO students (name) VALUES (?)", ((name,) for name in names))
+        placeholders = ",".join("?" * len(names))
+        return dict(self.conn.execute(f"SELECT name, id FROM students WHERE name IN ({placeholders})", names))
+
+    def index_session(self, csv_path, transcription_file=None, name=None, started_on=None):
+        """Add or refresh one session; unchanged CSVs (same mtime) are not re-aggregated.
+
+        A new `started_on` for an unchanged CSV only updates the session's date. Returns True if
+        the session was (re)indexed or its date changed.
+        """
+        name = name or os.path.splitext(os.path.basename(csv_path))[0]
+        csv_mtime = os.path.getmtime(csv_path)
+        row = self.conn.execute("SELECT csv_mtime, started_on FROM sessions WHERE name = ?", (name,)).fetchone()
+        if row is not None and row[0] == csv_mtime:
+            if started_on is None or started_on == row[1]:
+                return False
+            with self.conn:
+                self.conn.execute("UPDATE sessions SET started_on = ? WHERE name = ?", (started_on, name))
+            return True
+
+        if started_on is None:
+            started_on = datetime.date.fromtimestamp(csv_mtime).isoformat()
+
+        attention_data = AttentionStore.from_csv(csv_path)
+        grouped_data = group_attentiveness_by_interval(attention_data, interval=60)
+        student_rows = calculate_student_intervals(grouped_data)
+        # Minutes without samples still count towards the session's length
+        duration_minutes = max((parse_interval_label(label)[0] for label in grouped_data), default=-1) + 1
+
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE name = ?", (name,))
+            session_id = self.conn.execute(
+                "INSERT INTO sessions (name, csv_path, transcription_file, started_on, duration_minutes, csv_mtime)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (name, os.path.abspath(csv_path), transcription_file and os.path.abspath(transcription_file),
+                 started_on, duration_minutes, csv_mtime)).lastrowid
+            student_ids = self._student_ids(attention_data.registry.names)
+            self.conn.executemany(
+                "INSERT INTO minute_aggregates"
+                " (session_id, student_id, minute, attentive_count, total_count, percentage, state)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((session_id, student_ids[row["student"]], parse_interval_label(row["interval"])[0],
+                  row["attentive_count"], row["total_count"], row["attentiveness_percentage"], row["state"])
+                 for row in student_rows))
+        return True
+
+    def index_directory(self, directory, started_on=None):
+        """Index the CSV pair found in a session directory (named after the directory)."""
+        csv_path, transcription_file = discover_session_files(directory)
+        if csv_path is None:
+            print(f"No attention CSV found in {directory}")
+            return False
+        name = os.path.basename(os.path.normpath(directory))
+        return self.index_session(csv_path, transcription_file, name=name, started_on=started_on)
+
+    def state_runs(self, student, state="Inattentive", min_minutes=1, since=None, until=None):
+        """Find runs of consecutive minutes in which `student` was in `state`.
+
+        Returns (session, started_on, first_minute, last_minute, minutes) tuples for runs longer
+        than `min_minutes`, optionally limited to sessions started in [since, until].
+        """
+        return self.conn.execute(
+            """
+            WITH matching AS (
+                SELECT m.session_id, m.minute,
+                       m.minute - ROW_NUMBER() OVER (PARTITION BY m.session_id ORDER BY m.minute) AS run
+                FROM minute_aggregates m
+                JOIN students st ON st.id = m.student_id
+                JOIN sessions s ON s.id = m.session_id
+                WHERE st.name = :student AND m.state = :state
+                  AND (:since IS NULL OR s.started_on >= :since)
+                  AND (:until IS NULL OR s.started_on <= :until)
+            )
+            SELECT s.name, s.started_on, MIN(minute), MAX(minute), COUNT(*) AS minutes
+            FROM matching
+            JOIN sessions s ON s.id = matching.session_id
+            GROUP BY matching.session_id, run
+            HAVING minutes > :min_minutes
+            ORDER BY s.started_on, s.name, MIN(minute)
+            """,
+            {"student": student, "state": state, "min_minutes": min_minutes, "since": since, "until": until},
+        ).fetchall()
+
+    def student_minutes(self, student, since=None, until=None):
+        """All per-minute rows for a student as (session, started_on, minute, percentage, state)."""
+        return self.conn.execute(
+            """
+            SELECT s.name, s.started_on, m.minute, m.percentage, m.state
+            FROM minute_aggregates m
+            JOIN students st ON st.id = m.student_id
+            JOIN sessions s ON s.id = m.session_id
+            WHERE st.name = :student
+              AND (:since IS NULL OR s.started_on >= :since)
+              AND (:until IS NULL OR s.started_on <= :until)
+            ORDER BY s.started_on, s.name, m.minute
+            """,
+            {"student": student, "since": since, "until": until},
+        ).fetchall()
+
+
+def _month_start(today=None):
+    today = today or datetime.date.today()
+    return today.replace(day=1).isoformat()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index sessions into an SQLite catalog and query it.")
+    parser.add_argument("--db", default="sessions.sqlite", help="catalog database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="index session directories")
+    index_parser.add_argument("directories", nargs="+", help="directories holding an attention and a transcription CSV")
+    index_parser.add_argument("--date", help="session date (defaults to the attention CSV's modification date)")
+
+    runs_parser = commands.add_parser("runs", help="find runs of minutes a student spent in one state")
+    runs_parser.add_argument("student")
+    runs_parser.add_argument("--state", default="Inattentive", choices=["Inattentive", "Inconsistent", "Attentive"])
+    runs_parser.add_argument("--longer-than", type=int, default=3, help="minimum run length in minutes (exclusive)")
+    runs_parser.add_argument("--since", help="ISO date; defaults to the first day of this month")
+    runs_parser.add_argument("--until", help="ISO date")
+    args = parser.parse_args()
+
+    with SessionCatalog(args.db) as catalog:
+        if args.command == "index":
+            for directory in args.directories:
+                indexed = catalog.index_directory(directory, started_on=args.date)
+                print(f"{'indexed' if indexed else 'unchanged'}: {directory}")
+        else:
+            start = time.perf_counter()
+            runs = catalog.state_runs(args.student, args.state, args.longer_than,
+                                      since=args.since or _month_start(), until=args.until)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for session, started_on, first_minute, last_minute, minutes in runs:
+                print(f"{started_on} {session}: [{first_minute}-{last_minute + 1}] min ({minutes} minutes)")
+            print(f"{len(runs)} runs in {elapsed_ms:.1f} ms")
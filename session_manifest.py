@@ -0,0 +1,154 @@
+import json
+import os
+
+from session_archive import is_session_archive
+from session_catalog import csv_kind, discover_session_files
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi", ".webm")
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg", ".flac")
+
+# Manifest keys -> VideoPlayer arguments
+MANIFEST_KEYS = {
+    "video": "video_path",
+    "audio": "audio_path",
+    "attention": "csv_path",
+    "transcription": "transcription_file",
+    "archive": "archive_path",
+}
+
+# Keys of the extra video streams a manifest entry may list under "streams"
+STREAM_KEYS = {
+    "video": "video_path",
+    "attention": "csv_path",
+}
+
+
+def _first_with_extension(directory, extensions):
+    for entry in sorted(os.listdir(directory)):
+        path = os.path.join(directory, entry)
+        if entry.lower().endswith(extensions) and os.path.isfile(path):
+            return path
+    return None
+
+
+def session_from_directory(directory):
+    """Describe the session stored in `directory`.
+
+    The directory holds the video, optionally a separate audio file, and either the attention and
+    transcription CSVs (found by their headers) or an exported session archive.
+    """
+    session = {"name": os.path.basename(os.path.abspath(directory)), "video_path": None, "audio_path": None,
+               "csv_path": None, "transcription_file": None, "archive_path": None, "streams": []}
+    if not os.path.isdir(directory):
+        session["errors"] = [f"session directory not found: {directory}"]
+        return session
+    session["video_path"] = _first_with_extension(directory, VIDEO_EXTENSIONS)
+    session["audio_path"] = _first_with_extension(directory, AUDIO_EXTENSIONS)
+    if is_session_archive(directory):
+        session["archive_path"] = directory
+    else:
+        session["csv_path"], session["transcription_file"] = discover_session_files(directory)
+    return session
+
+
+def load_manifest(manifest_path):
+    """Read a JSON manifest listing sessions; relative paths are resolved against its directory.
+
+    Each entry is either a session directory or an object with any of "directory", "name", "video",
+    "audio", "attention", "transcription" and "archive"; explicit files override what is found in
+    "directory". "streams" lists further camera recordings played in sync with the main video, each
+    with a "video", an optional "attention" CSV, a "name" and the "offset" in seconds at which it
+    started relative to the main video::
+
+        {"sessions": ["2025-01-09/first_grade",
+                      {"name": "Math", "video": "math.mp4", "attention": "math.csv",
+                       "transcription": "math_words.csv",
+                       "streams": [{"name": "Room", "video": "room.mp4", "attention": "room.csv",
+                                    "offset": 2.5}]}]}
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, 'r', encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    sessions = []
+    for entry in manifest.get("sessions", []):
+        if isinstance(entry, str):
+            entry = {"directory": entry}
+        if "directory" in entry:
+            session = session_from_directory(os.path.join(base, entry["directory"]))
+        else:
+            session = {"name": None, "streams": [], **{argument: None for argument in MANIFEST_KEYS.values()}}
+        for key, argument in MANIFEST_KEYS.items():
+            if entry.get(key):
+                session[argument] = os.path.join(base, entry[key])
+        for number, stream_entry in enumerate(entry.get("streams", []), start=1):
+            stream = {argument: os.path.join(base, stream_entry[key]) if stream_entry.get(key) else None
+                      for key, argument in STREAM_KEYS.items()}
+            stream["name"] = stream_entry.get("name") or f"Stream {number}"
+            stream["offset"] = float(stream_entry.get("offset", 0))
+            session["streams"].append(stream)
+        if entry.get("name"):
+            session["name"] = entry["name"]
+        if not session["name"]:
+            session["name"] = os.path.splitext(os.path.basename(session["video_path"] or "session"))[0]
+        sessions.append(session)
+    return sessions
+
+
+def resolve_sessions(paths):
+    """Sessions for command-line arguments: manifests (.json) and session directories."""
+    sessions = []
+    for path in paths:
+        if path.lower().endswith(".json"):
+            if not os.path.isfile(path):
+                sessions.append({"name": path, "errors": [f"manifest not found: {path}"]})
+                continue
+            try:
+                sessions.extend(load_manifest(path))
+            except (OSError, ValueError) as e:
+                sessions.append({"name": path, "errors": [f"could not read manifest: {e}"]})
+        else:
+            sessions.append(session_from_directory(path))
+    return sessions
+
+
+def _check_file(path, label, kind=None):
+    if not path:
+        return f"no {label} found"
+    if not os.path.isfile(path):
+        return f"{label} not found: {path}"
+    if kind is not None:
+        try:
+            if csv_kind(path) != kind:
+                return f"{label} has an unexpected header: {path}"
+        except (OSError, UnicodeDecodeError) as e:
+            return f"could not read {label} {path}: {e}"
+    return None
+
+
+def validate_session(session):
+    """Problems that would stop `session` from opening, as a list of messages (empty if none)."""
+    errors = list(session.get("errors", []))
+    if errors:
+        return errors
+    errors.append(_check_file(session["video_path"], "video"))
+    if session["audio_path"]:
+        errors.append(_check_file(session["audio_path"], "audio file"))
+    if session["archive_path"]:
+        if not is_session_archive(session["archive_path"]):
+            errors.append(f"not a session archive: {session['archive_path']}")
+    else:
+        errors.append(_check_file(session["csv_path"], "attention CSV", "attention"))
+        errors.append(_check_file(session["transcription_file"], "transcription CSV", "transcription"))
+    for stream in session.get("streams", []):
+        errors.append(_check_file(stream["video_path"], f"video of stream {stream['name']}"))
+        if stream["csv_path"]:
+            errors.append(_check_file(stream["csv_path"], f"attention CSV of stream {stream['name']}", "attention"))
+    return [error for error in errors if error]
+
+
+def player_arguments(session):
+    """Keyword arguments for VideoPlayer from a resolved session."""
+    arguments = {argument: session[argument] for argument in MANIFEST_KEYS.values()}
+    arguments["streams"] = session.get("streams", [])
+    return arguments
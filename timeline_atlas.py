@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import zlib
+
+import numpy as np
+
+import backends
+from attention_store import AttentionState, StudentRegistry
+from scoring_policy import DEFAULT_POLICY
+
+TIMELINE_VERSION = 1
+TIMELINE_SUFFIX = ".timeline"  # Cache directory next to the video, e.g. lesson.mp4.timeline/
+THUMBNAIL_SECONDS = 10  # One thumbnail every this many seconds...
+MAX_THUMBNAILS = 720  # ...unless that would be more than this, then they are spread further apart
+THUMBNAIL_WIDTH = 128
+ATLAS_COLUMNS = 32  # Thumbnails per atlas row
+HEATMAP_CELL_SECONDS = 10
+NO_DATA_COLOR = (60, 60, 60)
+
+
+def _rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def timeline_cache_dir(video_path):
+    return video_path + TIMELINE_SUFFIX
+
+
+def attention_fingerprint(attention_data):
+    """Checksum of the samples and student names, so cached heatmaps follow edits to the data."""
+    checksum = zlib.crc32(attention_data.timestamps.tobytes())
+    checksum = zlib.crc32(attention_data.student_ids.tobytes(), checksum)
+    checksum = zlib.crc32(attention_data.states.tobytes(), checksum)
+    return zlib.crc32("\n".join(attention_data.registry.names).encode("utf-8"), checksum)
+
+
+def render_heatmap(attention_data, duration, cell_seconds=HEATMAP_CELL_SECONDS, policy=DEFAULT_POLICY):
+    """RGB image with one row per student and one column per `cell_seconds` of the lesson.
+
+    Cells are scored and colored like the subtitle cells (see scoring_policy.ScoringPolicy);
+    cells without samples are grey. Counting is one bincount over (student, cell, state).
+    """
+    n_cells = max(1, math.ceil(duration / cell_seconds))
+    n_students = len(attention_data.registry)
+    n_states = len(AttentionState)
+    cells = np.minimum(attention_data.timestamps // cell_seconds, n_cells - 1)
+    keys = (attention_data.student_ids.astype(np.int64) * n_cells + cells) * n_states + attention_data.states
+    counts = np.bincount(keys, minlength=n_students * n_cells * n_states).reshape(n_students, n_cells, n_states)
+    # Rows follow registry ids; the 'unknown' participant is left out
+    counts = counts[StudentRegistry.UNKNOWN_ID + 1:]
+
+    total = counts.sum(axis=2)
+    percentage = policy.percentage(counts)
+    bands = sorted(policy.colors)  # Lowest band first
+    palette = np.array([_rgb(color) for _, color in bands], dtype=np.uint8)
+    band = np.searchsorted([minimum for minimum, _ in bands], percentage, side="right") - 1
+    image = palette[np.maximum(band, 0)]
+    image[total == 0] = NO_DATA_COLOR
+    return np.ascontiguousarray(image)
+
+
+def sample_thumbnails(video_path, stop=None):
+    """Thumbnails every few seconds of the video, packed into one RGB atlas.
+
+    Frames are read sequentially with grab(), and only the sampled ones are retrieved and
+    converted, so there are no per-frame seeks. Returns (atlas, thumbnail_seconds, count,
+    (width, height), duration), or None if the video cannot be read or reports no frame count
+    (some containers and streams do), since the strip could not be placed on a time axis.
+    """
+    cv2 = backends.cv2()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open video {video_path} for thumbnails.")
+        return None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if frame_count <= 0 or width <= 0 or height <= 0:
+        cap.release()
+        print(f"Warning: {video_path} does not report its length; the timeline will have no thumbnails.")
+        return None
+    duration = frame_count / fps
+
+    thumbnail_seconds = max(THUMBNAIL_SECONDS, duration / MAX_THUMBNAILS)
+    count = max(1, math.ceil(duration / thumbnail_seconds))
+    size = (THUMBNAIL_WIDTH, max(1, round(THUMBNAIL_WIDTH * height / width)))
+    atlas = np.zeros((math.ceil(count / ATLAS_COLUMNS) * size[1], ATLAS_COLUMNS * size[0], 3), dtype=np.uint8)
+    thumbnail = np.empty((size[1], size[0], 3), dtype=np.uint8)
+
+    sampled = frame_index = 0
+    while sampled < count and (stop is None or not stop.is_set()):
+        if not cap.grab():
+            break
+        if frame_index >= round(sampled * thumbnail_seconds * fps):
+            ret, frame = cap.retrieve()
+            if ret:
+                cv2.resize(frame, size, dst=thumbnail, interpolation=cv2.INTER_AREA)
+                row, column = divmod(sampled, ATLAS_COLUMNS)
+                atlas[row * size[1]:(row + 1) * size[1], column * size[0]:(column + 1) * size[0]] = thumbnail
+            sampled += 1
+        frame_index += 1
+    cap.release()
+    if sampled == 0:
+        print(f"Error: Could not read frames from {video_path} for thumbnails.")
+        return None
+    cv2.cvtColor(atlas, cv2.COLOR_BGR2RGB, dst=atlas)
+    return atlas, thumbnail_seconds, sampled, size, duration
+
+
+def build_timeline(video_path, attention_data, stop=None):
+    """Sample thumbnails and render the heatmap for a session, and cache both next to the video.
+
+    Returns the timeline dict (see load_timeline). Without thumbnails (no video, or one that
+    cannot be sampled) the timeline only has the heatmap, spanning the attention samples.
+    """
+    timeline = {
+        "version": TIMELINE_VERSION,
+        "video_size": None,
+        "video_mtime": None,
+        "attention": attention_fingerprint(attention_data),
+        "students": attention_data.registry.names[StudentRegistry.UNKNOWN_ID + 1:],
+        "heatmap_cell_seconds": HEATMAP_CELL_SECONDS,
+        "thumbnails": None,
+    }
+    sampled = sample_thumbnails(video_path, stop) if os.path.isfile(video_path) else None
+    if stop is not None and stop.is_set():
+        return None
+    if os.path.isfile(video_path):
+        stat = os.stat(video_path)
+        timeline.update(video_size=stat.st_size, video_mtime=stat.st_mtime)
+    if sampled is not None:
+        atlas, thumbnail_seconds, count, size, duration = sampled
+        timeline.update(thumbnail_seconds=thumbnail_seconds, thumbnail_count=count, thumbnail_size=list(size),
+                        atlas_columns=ATLAS_COLUMNS)
+        timeline["thumbnails"] = atlas
+    else:
+        duration = int(attention_data.timestamps.max()) + 1 if len(attention_data.timestamps) else 1
+    timeline["duration"] = duration
+    timeline["heatmap"] = render_heatmap(attention_data, duration)
+    save_timeline(video_path, timeline)
+    return timeline
+
+
+def save_timeline(video_path, timeline):
+    """Write the atlases as images plus a JSON description into the cache directory."""
+    cv2 = backends.cv2()
+    cache_dir = timeline_cache_dir(video_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cv2.imwrite(os.path.join(cache_dir, "heatmap.png"), timeline["heatmap"][..., ::-1])
+        if timeline["thumbnails"] is not None:
+            cv2.imwrite(os.path.join(cache_dir, "thumbnails.jpg"), timeline["thumbnails"][..., ::-1],
+                        [cv2.IMWRITE_JPEG_QUALITY, 85])
+        metadata = {key: value for key, value in timeline.items() if key not in ("heatmap", "thumbnails")}
+        with open(os.path.join(cache_dir, "timeline.json"), 'w', encoding="utf-8") as f:
+            json.dump(metadata, f)
+    except OSError as e:
+        print(f"Warning: Could not cache the timeline in {cache_dir}: {e}")
+
+
+def load_timeline(video_path, attention_data):
+    """Cached timeline for the session, or None if there is none or it is out of date.
+
+    The dict holds "duration", "heatmap" (RGB, one row per student), "students",
+    "heatmap_cell_seconds" and, when the video could be sampled, "thumbnails" (RGB atlas) with
+    "thumbnail_seconds", "thumbnail_count", "thumbnail_size" and "atlas_columns".
+    """
+    cache_dir = timeline_cache_dir(video_path)
+    try:
+        with open(os.path.join(cache_dir, "timeline.json"), 'r', encoding="utf-8") as f:
+            timeline = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if timeline.get("version") != TIMELINE_VERSION or timeline.get("attention") != attention_fingerprint(attention_data):
+        return None
+    has_video = os.path.isfile(video_path)
+    if has_video != (timeline["video_size"] is not None):
+        return None
+    if has_video:
+        stat = os.stat(video_path)
+        if (stat.st_size, stat.st_mtime) != (timeline["video_size"], timeline["video_mtime"]):
+            return None
+    if not timeline.get("duration", 0) > 0:
+        return None  # Written before videos without a frame count were handled
+
+    cv2 = backends.cv2()
+    has_thumbnails = "thumbnail_count" in timeline
+    heatmap = cv2.imread(os.path.join(cache_dir, "heatmap.png"))
+    thumbnails = cv2.imread(os.path.join(cache_dir, "thumbnails.jpg")) if has_thumbnails else None
+    if heatmap is None or (has_thumbnails and thumbnails is None):
+        return None
+    timeline["heatmap"] = np.ascontiguousarray(heatmap[..., ::-1])
+    timeline["thumbnails"] = np.ascontiguousarray(thumbnails[..., ::-1]) if thumbnails is not None else None
+    return timeline
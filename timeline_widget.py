@@ -0,0 +1,148 @@
+import threading
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtCore import Qt, QRect, QRectF, pyqtSignal
+
+from scoring_policy import DEFAULT_POLICY
+from timeline_atlas import build_timeline, load_timeline, render_heatmap
+
+
+def _qimage(array):
+    """QImage sharing memory with an RGB array (the caller keeps the array alive)."""
+    height, width = array.shape[:2]
+    return QImage(array.data, width, height, 3 * width, QImage.Format_RGB888)
+
+
+class TimelineWidget(QWidget):
+    """Scrub bar showing a thumbnail strip above a per-student attention heatmap.
+
+    The atlases come from the session's timeline cache, or are built when it is missing or stale;
+    either happens on a background thread and they appear once ready. Clicking seeks to that point
+    of the lesson.
+    """
+
+    seek_requested = pyqtSignal(float)
+    timeline_ready = pyqtSignal(object)  # Emitted from the load/build thread, delivered on the UI thread
+
+    STRIP_HEIGHT = 48
+    HEATMAP_HEIGHT = 52
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timeline = None
+        self.thumbnail_image = None
+        self.heatmap = None
+        self.heatmap_image = None
+        self.position = None
+        self.playhead_x = None
+        self.attention_data = None
+        self.policy = DEFAULT_POLICY  # Cached heatmaps use the default policy; others are re-rendered
+        self._stop = threading.Event()
+        self.timeline_ready.connect(self.set_timeline)
+        self.setMinimumHeight(self.STRIP_HEIGHT + self.HEATMAP_HEIGHT)
+        self.setMaximumHeight(self.STRIP_HEIGHT + self.HEATMAP_HEIGHT)
+        self.setCursor(Qt.PointingHandCursor)
+
+    def load(self, video_path, attention_data):
+        """Load the cached timeline, or build it, in the background; it is shown once ready.
+
+        Even a cache hit is read on the background thread, since decoding the cached images imports
+        OpenCV, which the window must not wait for.
+        """
+        self.attention_data = attention_data
+
+        def run():
+            try:
+                timeline = load_timeline(video_path, attention_data)
+                if timeline is None:
+                    timeline = build_timeline(video_path, attention_data, self._stop)
+            except Exception as e:  # Never let a thumbnail problem take the player down
+                print(f"Error: Could not build the timeline for {video_path}: {e}")
+                return
+            if timeline is not None:
+                self.timeline_ready.emit(timeline)
+
+        threading.Thread(target=run, name="timeline-build", daemon=True).start()
+
+    def stop(self):
+        """Abandon a background build (e.g. when the window closes)."""
+        self._stop.set()
+
+    def set_policy(self, policy):
+        """Color the heatmap with `policy` (a cheap re-render; the thumbnails are kept)."""
+        self.policy = policy
+        if self.timeline is not None:
+            self.set_timeline(self.timeline)
+
+    def set_timeline(self, timeline):
+        self.timeline = timeline
+        heatmap = timeline["heatmap"]
+        if self.policy != DEFAULT_POLICY and self.attention_data is not None:
+            heatmap = render_heatmap(self.attention_data, timeline["duration"], timeline["heatmap_cell_seconds"],
+                                     self.policy)
+        self.heatmap = heatmap  # Keeps the array behind heatmap_image alive
+        self.heatmap_image = _qimage(heatmap)
+        self.thumbnail_image = _qimage(timeline["thumbnails"]) if timeline["thumbnails"] is not None else None
+        if timeline["students"]:
+            self.setToolTip("Rows, top to bottom: " + ", ".join(timeline["students"]))
+        self.playhead_x = None
+        self.update()
+
+    def set_position(self, current_time):
+        """Move the playhead, repainting only the columns it left and entered."""
+        self.position = current_time
+        if self.timeline is None:
+            return
+        x = int(current_time / self.timeline["duration"] * self.width())
+        if x != self.playhead_x:
+            if self.playhead_x is not None:
+                self.update(QRect(self.playhead_x - 1, 0, 3, self.height()))
+            self.update(QRect(x - 1, 0, 3, self.height()))
+            self.playhead_x = x
+
+    def mousePressEvent(self, event):
+        if self.timeline is not None and event.button() == Qt.LeftButton:
+            fraction = min(max(event.x() / max(1, self.width()), 0.0), 1.0)
+            self.seek_requested.emit(fraction * self.timeline["duration"])
+
+    def resizeEvent(self, event):
+        self.playhead_x = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(35, 35, 35))
+        if self.timeline is None:
+            painter.setPen(QColor(170, 170, 170))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Preparing timeline...")
+            painter.end()
+            return
+
+        width = self.width()
+        duration = self.timeline["duration"]
+        if self.thumbnail_image is not None:
+            self._paint_thumbnails(painter, width, duration)
+
+        # The heatmap's last cell may run past the end of the video, so scale it by its own length
+        heatmap_width = self.heatmap_image.width() * self.timeline["heatmap_cell_seconds"] / duration * width
+        painter.drawImage(QRectF(0, self.STRIP_HEIGHT, heatmap_width, self.HEATMAP_HEIGHT), self.heatmap_image)
+
+        if self.position is not None:
+            x = int(self.position / duration * width)
+            painter.fillRect(QRect(x - 1, 0, 3, self.height()), QColor("#F44336"))
+        painter.end()
+
+    def _paint_thumbnails(self, painter, width, duration):
+        """Fill the strip with as many thumbnails as fit, each taken from the middle of its span."""
+        timeline = self.timeline
+        thumbnail_width, thumbnail_height = timeline["thumbnail_size"]
+        shown_width = self.STRIP_HEIGHT * thumbnail_width / thumbnail_height
+        slots = max(1, int(width // shown_width) + 1)
+        slot_width = width / slots
+        for slot in range(slots):
+            slot_time = (slot + 0.5) / slots * duration
+            index = min(int(slot_time / timeline["thumbnail_seconds"]), timeline["thumbnail_count"] - 1)
+            row, column = divmod(index, timeline["atlas_columns"])
+            source = QRectF(column * thumbnail_width, row * thumbnail_height, thumbnail_width, thumbnail_height)
+            painter.drawImage(QRectF(slot * slot_width, 0, slot_width, self.STRIP_HEIGHT), self.thumbnail_image, source)
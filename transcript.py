@@ -0,0 +1,183 @@
+import csv
+import json
+import os
+import re
+import sys
+from bisect import bisect_left
+
+import numpy as np
+
+
+def format_timestamp(seconds):
+    """Format seconds as HH:MM:SS (transcript and dashboard timestamps)."""
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def load_word_subtitles(word_file):
+    """Load word-by-word subtitles (Word, Start Time, End Time) from the transcription CSV."""
+    word_subtitles = []
+    with open(word_file, 'r', encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            word_subtitles.append({
+                "start": float(row['Start Time']),
+                "end": float(row['End Time']),
+                "word": row['Word'].strip(),
+                'processed': False
+            })
+    return word_subtitles
+
+
+class WordColumns:
+    """Transcript words stored as columns (start and end arrays plus the word strings), by start time.
+
+    Word dicts, shaped like load_word_subtitles' entries, are only built for the rows asked for, so
+    a long transcript costs a few bytes per word rather than a dict each. `words` can be any
+    sliceable sequence of strings, including a memory-mapped Arrow string array.
+    """
+
+    def __init__(self, starts, ends, words):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        if len(starts) > 1 and np.any(starts[1:] < starts[:-1]):
+            order = np.argsort(starts, kind="stable")
+            starts, ends = starts[order], ends[order]
+            words = words.take(order) if hasattr(words, "take") else [words[i] for i in order]
+        self.starts = starts
+        self.ends = ends
+        self.words = words
+
+    @classmethod
+    def from_word_subtitles(cls, word_subtitles):
+        return cls([word["start"] for word in word_subtitles],
+                   [word["end"] for word in word_subtitles],
+                   [word["word"] for word in word_subtitles])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _strings(self, lo, hi):
+        strings = self.words[lo:hi]
+        return strings.to_pylist() if hasattr(strings, "to_pylist") else list(strings)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            lo, hi, step = key.indices(len(self))
+            if step != 1:
+                return [self[position] for position in range(lo, hi, step)]
+            return [{"start": start, "end": end, "word": word, 'processed': False}
+                    for start, end, word in zip(self.starts[lo:hi].tolist(), self.ends[lo:hi].tolist(),
+                                                self._strings(lo, hi))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("word position out of range")
+        return self[key:key + 1][0]
+
+    def __iter__(self):
+        for lo in range(0, len(self), 4096):  # Build dicts a block at a time
+            yield from self[lo:lo + 4096]
+
+    def window(self, start_time, end_time):
+        """Words starting in [start_time, end_time)."""
+        lo = int(np.searchsorted(self.starts, start_time, side="left"))
+        hi = int(np.searchsorted(self.starts, end_time, side="left"))
+        return self[lo:hi]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns (for Arrow strings, the mapped buffers)."""
+        if hasattr(self.words, "nbytes"):
+            words_bytes = self.words.nbytes
+        else:
+            words_bytes = sys.getsizeof(self.words) + sum(sys.getsizeof(word) for word in self.words)
+        return self.starts.nbytes + self.ends.nbytes + words_bytes
+
+
+_TOKEN_RE = re.compile(r"[^\w']+")
+INDEX_SUFFIX = ".index.json"
+INDEX_VERSION = 1
+
+
+def normalize_token(word):
+    """Lower-case a transcript word and strip punctuation ("Okay," -> "okay", keeps "we're")."""
+    return _TOKEN_RE.sub("", word.lower()).strip("'")
+
+
+class TranscriptIndex:
+    """Inverted index from normalized tokens to the sorted positions of the words that match them.
+
+    Positions index into `starts`, the words' start times in transcript order, so a lookup is a
+    dict access (or a binary search over the sorted vocabulary for prefixes) and a list slice.
+    """
+
+    def __init__(self, starts, postings):
+        self.starts = starts
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, word_subtitles):
+        words = sorted(word_subtitles, key=lambda word: word["start"])
+        postings = {}
+        for position, word in enumerate(words):
+            token = normalize_token(word["word"])
+            if token:
+                postings.setdefault(token, []).append(position)
+        return cls([word["start"] for word in words], postings)
+
+    def _positions(self, token, prefix):
+        if not prefix:
+            return self.postings.get(token, [])
+        # All tokens sharing the prefix are contiguous in the sorted vocabulary
+        positions = []
+        i = bisect_left(self.vocabulary, token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+            positions.extend(self.postings[self.vocabulary[i]])
+            i += 1
+        return sorted(positions)
+
+    def search(self, query, prefix=True):
+        """Return the start times where `query` is spoken, in order.
+
+        Multi-word queries match consecutive words; the last word may be a prefix, so results
+        appear while the user is still typing.
+        """
+        tokens = [token for token in (normalize_token(part) for part in query.split()) if token]
+        if not tokens:
+            return []
+        positions = self._positions(tokens[0], prefix and len(tokens) == 1)
+        for offset, token in enumerate(tokens[1:], start=1):
+            following = set(self._positions(token, prefix and offset == len(tokens) - 1))
+            positions = [position for position in positions if position + offset in following]
+        return [self.starts[position] for position in positions]
+
+    def save(self, path):
+        with open(path, 'w', encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "starts": self.starts, "postings": self.postings}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported transcript index version in {path}")
+        return cls(data["starts"], data["postings"])
+
+
+def load_transcript_index(word_file, word_subtitles):
+    """Load the index saved next to `word_file`, rebuilding and saving it if missing or stale."""
+    index_path = word_file + INDEX_SUFFIX
+    try:
+        if os.path.getmtime(index_path) >= os.path.getmtime(word_file):
+            return TranscriptIndex.load(index_path)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = TranscriptIndex.build(word_subtitles)
+    try:
+        index.save(index_path)
+    except OSError as e:
+        print(f"Could not save transcript index {index_path}: {e}")
+    return index
@@ -0,0 +1,151 @@
+import threading
+from collections import deque
+
+import backends
+from video_surface import FramePool
+
+RING_FRAMES = 4  # Frames decoded ahead of the media clock per stream
+SEEK_FRAMES = 60  # A stream this far behind seeks instead of skipping frame by frame
+
+
+class StreamDecoder:
+    """A secondary video stream (e.g. the room camera next to a Zoom gallery) decoded on its own thread.
+
+    The worker keeps a small ring of converted frames ahead of the frame the media clock asks for.
+    The GUI thread only takes frames out of the ring (frame_at), never waits for a decode: frames
+    that are already late when they come out of the decoder are skipped or dropped, and a stream
+    that falls far behind seeks to catch up. `offset` is the media time at which the stream's first
+    frame was recorded, so streams that started later stay in sync.
+    """
+
+    def __init__(self, video_path, offset=0.0, name=None, target_width=480, ring_frames=RING_FRAMES):
+        self.video_path = video_path
+        self.offset = offset
+        self.name = name or video_path
+        self.ring_frames = ring_frames
+        # Ring frames, the frame on screen and the one being converted each need their own buffer
+        self.frame_pool = FramePool(target_width, slots=ring_frames + 2)
+        self.ring = deque()  # (frame_index, slot), oldest first
+        self.cap = None
+        self.fps = 30
+        self.total_frames = 0
+        self.target_frame = 0  # Frame the media clock wants now (set by the GUI thread)
+        self.shown = 0
+        self.dropped = 0  # Frames skipped or discarded because they were late
+        self._position = 0  # Index of the frame cap.read() returns next (worker side)
+        self._ended = False
+        self._displayed_slot = None
+        self._running = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def frame_index(self, media_time):
+        return int((media_time - self.offset) * self.fps)
+
+    def start(self, start_time=0.0):
+        """Open the stream and start decoding from `start_time` (media time); False if it cannot be read."""
+        self.stop()
+        cv2 = backends.cv2()
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video stream {self.video_path}.")
+            return False
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_pool.configure(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.cap = cap
+        self.ring.clear()
+        self._position = 0
+        self._ended = False
+        self._displayed_slot = None
+        self.target_frame = self.frame_index(start_time)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"stream-decode-{self.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop the worker and release the stream."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def frame_at(self, media_time):
+        """QImage due at `media_time`, or None to keep showing the current one; never blocks on decoding.
+
+        Ring frames older than the one due were late and are dropped.
+        """
+        with self._condition:
+            self.target_frame = self.frame_index(media_time)
+            slot = None
+            while self.ring and self.ring[0][0] <= self.target_frame:
+                if slot is not None:
+                    self.dropped += 1
+                _, slot = self.ring.popleft()
+            if slot is not None:
+                self._displayed_slot = slot
+                self.shown += 1
+            self._condition.notify()
+        return self.frame_pool.images[slot] if slot is not None else None
+
+    def _next_step(self):
+        """What the worker does next, decided under the lock: "stop", "seek", "skip", "decode" or "wait"."""
+        if not self._running:
+            return "stop"
+        target = self.target_frame
+        if target < 0:
+            return "wait"  # The stream has not started yet
+        if self._position > target + self.ring_frames:
+            return "seek"  # Seeked backwards
+        if target - self._position > SEEK_FRAMES and (self.total_frames == 0 or target < self.total_frames):
+            return "seek"  # Too far behind to catch up by skipping
+        if self._ended:
+            return "wait"
+        if self._position < target:
+            return "skip"
+        return "decode" if len(self.ring) < self.ring_frames else "wait"
+
+    def _run(self):
+        cv2 = backends.cv2()
+        while True:
+            with self._condition:
+                step = self._next_step()
+                while step == "wait":
+                    self._condition.wait()
+                    step = self._next_step()
+                if step == "stop":
+                    return
+                target = self.target_frame
+                if step == "seek":
+                    self.ring.clear()
+                used = {slot for _, slot in self.ring} | {self._displayed_slot}
+                free_slot = next(slot for slot in range(self.frame_pool.slots) if slot not in used)
+
+            # Decoding happens outside the lock so frame_at never waits for it
+            if step == "seek":
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                self._position = target
+                self._ended = False
+                continue
+            if step == "skip":
+                if not self.cap.grab():
+                    self._ended = True
+                    continue
+                self._position += 1
+                with self._condition:
+                    self.dropped += 1
+                continue
+            frame = self.frame_pool.read(self.cap)
+            if frame is None:
+                self._ended = True
+                continue
+            self.frame_pool.convert(frame, free_slot)
+            with self._condition:
+                self.ring.append((self._position, free_slot))
+            self._position += 1
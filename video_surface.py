@@ -0,0 +1,104 @@
+import numpy as np
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QImage, QPainter, QColor, QPainterPath
+from PyQt5.QtCore import Qt, QRectF
+
+import backends
+
+
+class FramePool:
+    """Preallocated buffers for decoding, resizing and converting video frames.
+
+    Buffers are sized once per video; afterwards cv2 writes into them through `dst=` and each
+    RGB buffer is wrapped by a QImage built once, so steady-state playback allocates nothing per
+    frame. RGB buffers rotate between `slots`, so the frame being painted is never overwritten by
+    the one being prepared.
+    """
+
+    def __init__(self, target_width=1100, slots=2):
+        self.target_width = target_width
+        self.slots = slots
+        self.source_size = None
+        self._next_slot = 0
+
+    def configure(self, width, height):
+        """Allocate buffers for a `width` x `height` source (no-op if already sized for it)."""
+        if self.source_size == (width, height):
+            return
+        self.source_size = (width, height)
+        aspect_ratio = width / height
+        self.target_size = (self.target_width, int(self.target_width / aspect_ratio))
+        target_width, target_height = self.target_size
+
+        self.decoded = np.empty((height, width, 3), dtype=np.uint8)
+        self.resized = np.empty((target_height, target_width, 3), dtype=np.uint8)
+        self.rgb = [np.empty((target_height, target_width, 3), dtype=np.uint8) for _ in range(self.slots)]
+        # The QImages share memory with the RGB buffers; the pool keeps both alive
+        self.images = [QImage(buffer.data, target_width, target_height, 3 * target_width, QImage.Format_RGB888)
+                       for buffer in self.rgb]
+
+    def read(self, cap):
+        """Decode the next frame of `cap` into the pool's decode buffer; returns it or None."""
+        ret, frame = cap.read(self.decoded)
+        if not ret:
+            return None
+        if frame is not self.decoded and frame.shape != self.decoded.shape:
+            # The stream changed size mid-way. Only the decode buffer follows it: a surface may still be
+            # painting a QImage over the RGB buffers, so those keep their size and frames are scaled into them
+            self.decoded = frame
+        return frame
+
+    def convert(self, frame, slot=None):
+        """Resize and convert a BGR frame into the next RGB slot (or `slot`); returns that slot's QImage."""
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.slots
+        cv2 = backends.cv2()
+        cv2.resize(frame, self.target_size, dst=self.resized)  # Resize to fit the window
+        cv2.cvtColor(self.resized, cv2.COLOR_BGR2RGB, dst=self.rgb[slot])
+        return self.images[slot]
+
+
+class VideoSurface(QWidget):
+    """Widget that paints the current frame's QImage directly, without a QPixmap per frame."""
+
+    RADIUS = 15
+    SHADOW_OFFSET = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image = None
+        self.setAttribute(Qt.WA_OpaquePaintEvent, False)
+        self.setMinimumSize(320, 180)
+
+    def set_image(self, image):
+        self.image = image
+        self.update()
+
+    def clear(self):
+        self.image = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        frame_rect = QRectF(self.rect()).adjusted(1, 1, -1 - self.SHADOW_OFFSET, -1 - self.SHADOW_OFFSET)
+
+        # Drawn shadow and rounded frame (a QGraphicsEffect would re-render the widget offscreen every frame)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 90))
+        painter.drawRoundedRect(frame_rect.translated(self.SHADOW_OFFSET, self.SHADOW_OFFSET), self.RADIUS, self.RADIUS)
+        painter.setPen(QColor("#555"))
+        painter.setBrush(Qt.black)
+        painter.drawRoundedRect(frame_rect, self.RADIUS, self.RADIUS)
+
+        if self.image is not None:
+            clip = QPainterPath()
+            clip.addRoundedRect(frame_rect, self.RADIUS, self.RADIUS)
+            painter.setClipPath(clip)
+            image_width, image_height = self.image.width(), self.image.height()
+            scale = min(frame_rect.width() / image_width, frame_rect.height() / image_height, 1.0)
+            target = QRectF(0, 0, image_width * scale, image_height * scale)
+            target.moveCenter(frame_rect.center())
+            painter.drawImage(target, self.image)
+        painter.end()